@@ -13,18 +13,32 @@ Usage:
 """
 
 import argparse
+import atexit
+import bz2
+import csv
+import gzip
+import itertools
 import json
+import lzma
 import os
+import sqlite3
 import sys
+import threading
 import time
-from datetime import datetime, timezone
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # Import shared auth from spotify_auth.py
 from spotify_auth import get_spotify_client, load_env, get_state_dir
+from liked_songs_mirror import FULL_SYNC_INTERVAL_DAYS, get_liked_songs, sync_liked_songs
+from spotify_paging import fetch_all_items
+from state_io import append_jsonl, read_jsonl, state_lock, write_json_atomic
 
 # Optional OpenAI import
 try:
@@ -41,6 +55,16 @@ except ImportError:
 MUSICBRAINZ_USER_AGENT = "SpotifyCountryPlaylists/1.0 (https://github.com/davedotluebke/spotify-tools)"
 MUSICBRAINZ_API_BASE = "https://musicbrainz.org/ws/2"
 MUSICBRAINZ_RATE_LIMIT = 1.0  # seconds between requests
+MUSICBRAINZ_WORKERS = 4  # concurrent lookups (still paced by MUSICBRAINZ_RATE_LIMIT)
+MUSICBRAINZ_MAX_RETRIES = 3  # retries on throttling (429/503), server errors and connection failures
+MUSICBRAINZ_BACKOFF_FACTOR = 2.0  # seconds before the first retry, doubling per retry (unless Retry-After says otherwise)
+OPENAI_WORKERS = 4  # concurrent OpenAI fallback requests
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_BATCH_SIZE = 25  # artists per batched OpenAI request
+
+# Artist cache lookups are journaled in batches (see cache_artist_country)
+ARTIST_CACHE_FLUSH_EVERY = 25  # new entries per journal write
+ARTIST_CACHE_FLUSH_SECONDS = 30.0  # ...or at least this often
 
 # Country name normalization map (for variations, not cities)
 COUNTRY_ALIASES = {
@@ -89,6 +113,10 @@ def get_artist_cache_path() -> Path:
     return get_country_state_dir() / "artist-countries.json"
 
 
+def get_artist_cache_journal_path() -> Path:
+    return get_country_state_dir() / "artist-countries.jsonl"
+
+
 def get_processed_songs_path() -> Path:
     return get_country_state_dir() / "processed-songs.json"
 
@@ -97,24 +125,83 @@ def get_playlist_ids_path() -> Path:
     return get_country_state_dir() / "playlist-ids.json"
 
 
+def get_state_lock_path() -> Path:
+    """Lock held by runs that write the country state (see state_io.state_lock)."""
+    return get_country_state_dir() / "state.lock"
+
+
+# New cache entries not yet written to the journal
+_pending_artist_entries: Dict[str, Dict[str, Any]] = {}
+_last_artist_cache_flush = time.time()
+
+
 def load_artist_cache() -> Dict[str, Dict[str, Any]]:
-    """Load cached artist → country mappings."""
+    """Load cached artist → country mappings (JSON file + journaled updates)."""
     path = get_artist_cache_path()
+    cache = {}
     if path.exists():
         with open(path, "r") as f:
-            return json.load(f)
-    return {}
+            cache = json.load(f)
+    for record in read_jsonl(get_artist_cache_journal_path()):
+        cache[record["artist_id"]] = record["data"]
+    return cache
 
 
 def save_artist_cache(cache: Dict[str, Dict[str, Any]]) -> None:
-    """Save artist → country cache."""
+    """
+    Save the full artist → country cache.
+    
+    This also compacts: the journal is folded into artist-countries.json and
+    removed. Called once at the end of a run, not per lookup.
+    """
+    global _last_artist_cache_flush
     path = get_artist_cache_path()
-    with open(path, "w") as f:
-        json.dump(cache, f, indent=2)
+    write_json_atomic(path, cache)
+    journal_path = get_artist_cache_journal_path()
+    if journal_path.exists():
+        journal_path.unlink()
+    _pending_artist_entries.clear()
+    _last_artist_cache_flush = time.time()
+
+
+def flush_artist_cache() -> None:
+    """Append pending cache entries to the journal (registered to run at exit)."""
+    global _last_artist_cache_flush
+    if _pending_artist_entries:
+        append_jsonl(
+            get_artist_cache_journal_path(),
+            [{"artist_id": aid, "data": data} for aid, data in _pending_artist_entries.items()],
+        )
+        _pending_artist_entries.clear()
+    _last_artist_cache_flush = time.time()
+
+
+def cache_artist_country(
+    cache: Dict[str, Dict[str, Any]],
+    artist_id: str,
+    data: Dict[str, Any],
+) -> None:
+    """
+    Store a lookup result in the in-memory cache and queue it for the journal.
+    
+    The journal is appended every ARTIST_CACHE_FLUSH_EVERY entries or
+    ARTIST_CACHE_FLUSH_SECONDS, so a crash loses at most one batch of lookups
+    instead of each lookup rewriting the whole cache file.
+    """
+    cache[artist_id] = data
+    _pending_artist_entries[artist_id] = data
+    if (len(_pending_artist_entries) >= ARTIST_CACHE_FLUSH_EVERY
+            or time.time() - _last_artist_cache_flush >= ARTIST_CACHE_FLUSH_SECONDS):
+        flush_artist_cache()
 
 
 def load_processed_songs() -> Dict[str, Any]:
-    """Load set of already-processed song IDs."""
+    """
+    Load set of already-processed song IDs.
+    
+    Also holds the sync state: "watermark" (added_at of the newest Liked Song
+    seen, see fetch_all_liked_songs) and "last_full_sync".
+    """
     path = get_processed_songs_path()
     if path.exists():
         with open(path, "r") as f:
@@ -125,8 +212,7 @@ def load_processed_songs() -> Dict[str, Any]:
 def save_processed_songs(data: Dict[str, Any]) -> None:
     """Save processed songs data."""
     path = get_processed_songs_path()
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(path, data)
 
 
 def load_playlist_ids() -> Dict[str, str]:
@@ -141,56 +227,44 @@ def load_playlist_ids() -> Dict[str, str]:
 def save_playlist_ids(data: Dict[str, str]) -> None:
     """Save playlist ID mappings."""
     path = get_playlist_ids_path()
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(path, data)
 
 
 # =============================================================================
 # Spotify API Helpers
 # =============================================================================
 
-def fetch_all_liked_songs(sp) -> List[Dict[str, Any]]:
-    """Fetch all liked songs from Spotify (handles pagination)."""
-    songs = []
-    offset = 0
-    limit = 50
-    
-    print("📚 Fetching Liked Songs...")
-    
-    while True:
-        results = sp.current_user_saved_tracks(limit=limit, offset=offset)
-        items = results.get("items", [])
-        
-        if not items:
-            break
-            
-        for item in items:
-            track = item.get("track")
-            if track and track.get("id"):
-                album = track.get("album", {})
-                songs.append({
-                    "track_id": track["id"],
-                    "track_name": track["name"],
-                    "album_name": album.get("name"),
-                    "artists": [
-                        {"id": a["id"], "name": a["name"]}
-                        for a in track.get("artists", [])
-                    ],
-                    "added_at": item.get("added_at"),
-                })
-        
-        offset += limit
-        if len(items) < limit:
-            break
-            
-        # Progress indicator
-        if offset % 200 == 0:
-            print(f"   ...fetched {offset} songs")
+def fetch_all_liked_songs(
+    sp, since: Optional[str] = None, full: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Get liked songs from the shared Liked Songs mirror (see liked_songs_mirror),
+    syncing it with Spotify first. Normally only songs added since the last
+    sync are fetched; full=True re-fetches the whole library.
     
-    print(f"   ✓ Found {len(songs)} total Liked Songs")
+    If since (an added_at watermark) is given, only songs added at or after it
+    are returned, newest first.
+    """
+    sync_liked_songs(
+        lambda offset, limit: sp.current_user_saved_tracks(limit=limit, offset=offset),
+        full=full,
+    )
+    songs = get_liked_songs(since=since)
+    if since:
+        print(f"   ✓ Found {len(songs)} Liked Songs since last run")
+    else:
+        print(f"   ✓ Found {len(songs)} total Liked Songs")
     return songs
 
 
+def full_sync_due(processed_data: Dict[str, Any]) -> bool:
+    """True if there is no watermark yet or the last full sync is too old."""
+    if not processed_data.get("watermark") or not processed_data.get("last_full_sync"):
+        return True
+    last_full_sync = datetime.fromisoformat(processed_data["last_full_sync"])
+    return datetime.now(timezone.utc) - last_full_sync >= timedelta(days=FULL_SYNC_INTERVAL_DAYS)
+
+
 def get_or_create_playlist(sp, country: str, playlist_ids: Dict[str, str]) -> str:
     """Get existing playlist ID or create new one for a country."""
     if country in playlist_ids:
@@ -215,32 +289,20 @@ def get_or_create_playlist(sp, country: str, playlist_ids: Dict[str, str]) -> st
 
 def get_playlist_track_ids(sp, playlist_id: str) -> Set[str]:
     """Get all track IDs currently in a playlist."""
-    track_ids = set()
-    offset = 0
-    limit = 100
-    
-    while True:
-        results = sp.playlist_items(
+    items = fetch_all_items(
+        lambda offset, limit: sp.playlist_items(
             playlist_id,
             limit=limit,
             offset=offset,
-            fields="items(track(id)),next"
-        )
-        items = results.get("items", [])
-        
-        if not items:
-            break
-            
-        for item in items:
-            track = item.get("track")
-            if track and track.get("id"):
-                track_ids.add(track["id"])
-        
-        offset += limit
-        if len(items) < limit:
-            break
-    
-    return track_ids
+            fields="items(track(id)),total"
+        ),
+        limit=100,
+    )
+    return {
+        item["track"]["id"]
+        for item in items
+        if item.get("track") and item["track"].get("id")
+    }
 
 
 def add_tracks_to_playlist(sp, playlist_id: str, track_ids: List[str]) -> None:
@@ -291,37 +353,117 @@ def clear_country_playlists(sp) -> None:
 # MusicBrainz API
 # =============================================================================
 
-_last_musicbrainz_request = 0.0
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+    
+    Allows `rate` acquisitions per second on average, with bursts of up to
+    `capacity`. Callers block in acquire() until a token is available.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class MusicBrainzUnavailable(Exception):
+    """
+    MusicBrainz throttled us or could not be reached (after retries).
+    
+    Unlike "not found", this says nothing about the artist, so callers defer
+    the lookup to a later run instead of paying for an OpenAI fallback.
+    """
+
+
+_musicbrainz_session: Optional[requests.Session] = None
+_musicbrainz_session_lock = threading.Lock()
+
+
+def get_musicbrainz_session() -> requests.Session:
+    """
+    Return the shared keep-alive session for MusicBrainz requests.
+    
+    Connections are pooled (one per worker thread). Retries are left to
+    musicbrainz_request, so each attempt waits for the shared token bucket.
+    """
+    global _musicbrainz_session
+    with _musicbrainz_session_lock:
+        if _musicbrainz_session is None:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MUSICBRAINZ_WORKERS)
+            session = requests.Session()
+            session.headers["User-Agent"] = MUSICBRAINZ_USER_AGENT
+            session.mount("https://", adapter)
+            _musicbrainz_session = session
+    return _musicbrainz_session
+
+
+# Shared by all MusicBrainz worker threads. Capacity 1 (no bursts): MusicBrainz
+# allows one request per second on average and throttles bursts.
+_musicbrainz_bucket = TokenBucket(rate=1.0 / MUSICBRAINZ_RATE_LIMIT)
+
+
+def _musicbrainz_retry_wait(response: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before a retry: Retry-After if present, else exponential."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return MUSICBRAINZ_BACKOFF_FACTOR * (2 ** attempt)
 
 
 def musicbrainz_request(endpoint: str, params: Dict[str, str] = None) -> Optional[Dict]:
-    """Make a rate-limited request to MusicBrainz API. Returns None on any error."""
-    global _last_musicbrainz_request
+    """
+    Make a rate-limited request to MusicBrainz API.
     
-    # Rate limiting - be conservative
-    elapsed = time.time() - _last_musicbrainz_request
-    min_wait = 1.5
-    if elapsed < min_wait:
-        time.sleep(min_wait - elapsed)
+    Throttling (429/503), server errors and connection failures are retried
+    up to MUSICBRAINZ_MAX_RETRIES times, waiting for Retry-After if sent and
+    otherwise backing off exponentially. Every attempt, retries included,
+    takes a token from the shared bucket.
     
+    Returns the parsed JSON, or None if MusicBrainz has no usable answer
+    (e.g. a 4xx for a bad query). Raises MusicBrainzUnavailable if it is
+    throttling or unreachable even after retries.
+    """
     if params is None:
         params = {}
     params["fmt"] = "json"
-    headers = {"User-Agent": MUSICBRAINZ_USER_AGENT}
-    
-    try:
-        url = f"{MUSICBRAINZ_API_BASE}/{endpoint}"
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        _last_musicbrainz_request = time.time()
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            # Any error - just return None and let OpenAI handle it
+    url = f"{MUSICBRAINZ_API_BASE}/{endpoint}"
+    
+    for attempt in range(MUSICBRAINZ_MAX_RETRIES + 1):
+        _musicbrainz_bucket.acquire()
+        try:
+            response = get_musicbrainz_session().get(url, params=params, timeout=10)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            response, error = None, str(e)
+        except requests.RequestException:
             return None
-    except requests.RequestException:
-        # Connection error, timeout, etc. - let OpenAI handle it
-        return None
+        else:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code != 429 and response.status_code < 500:
+                # Other errors - just return None and let OpenAI handle it
+                return None
+            error = f"HTTP {response.status_code}"
+        
+        if attempt < MUSICBRAINZ_MAX_RETRIES:
+            time.sleep(_musicbrainz_retry_wait(response, attempt))
+    
+    raise MusicBrainzUnavailable(error)
 
 
 
@@ -329,10 +471,18 @@ def lookup_artist_musicbrainz(artist_name: str, spotify_id: str = None) -> Optio
     """
     Look up an artist's country via MusicBrainz.
     
+    Checks the offline index (--build-mb-index) first and only queries the
+    live API for artists missing from it.
+    
     Returns normalized country name or None if not found.
+    Raises MusicBrainzUnavailable if MusicBrainz is throttling or down.
     Only returns a result if MusicBrainz has a Country-type area.
     For cities/regions, returns None to let OpenAI handle it (avoids extra API calls).
     """
+    indexed = lookup_artist_mb_index(artist_name, spotify_id)
+    if indexed is not None:
+        return indexed["country"]
+    
     # Search for artist by name (simple search, not strict field match)
     params = {"query": artist_name, "limit": "10"}
     result = musicbrainz_request("artist", params)
@@ -399,16 +549,223 @@ def normalize_country(country: str) -> str:
 
 
 # =============================================================================
-# OpenAI Fallback
+# Offline MusicBrainz Index
 # =============================================================================
+#
+# --build-mb-index loads a local MusicBrainz artist dump into a small SQLite
+# index (musicbrainz-index.db) mapping Spotify artist IDs and normalized
+# artist names/aliases to the artist's area and (for Country-type areas) its
+# country. lookup_artist_musicbrainz consults it first, so most lookups need
+# no network and no rate limiting.
+
+MB_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (name TEXT PRIMARY KEY, area TEXT, country TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS spotify (spotify_id TEXT PRIMARY KEY, area TEXT, country TEXT) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
 
-def lookup_artist_openai(artist_name: str, song_name: str = None, album_name: str = None) -> Optional[str]:
+_mb_index: Optional[sqlite3.Connection] = None
+_mb_index_checked = False
+_mb_index_lock = threading.Lock()
+
+
+def get_mb_index_path() -> Path:
+    return get_country_state_dir() / "musicbrainz-index.db"
+
+
+def normalize_artist_name(name: str) -> str:
+    """Normalize an artist name for index keys (Unicode, case and spacing)."""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def _open_dump(path: Path):
+    """Open a dump file as text, transparently decompressing .gz/.bz2/.xz."""
+    openers = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+    opener = openers.get(path.suffix, open)
+    return opener(path, "rt", encoding="utf-8")
+
+
+def iter_mb_dump_artists(path: Path) -> Iterator[Dict[str, Any]]:
     """
-    Look up an artist's country via OpenAI API.
+    Yield artists from a MusicBrainz dump as {names, area, area_type, spotify_ids}.
+    
+    Supported formats:
+    - JSON Lines, one artist object per line — the official JSON dump
+      (mbdump/artist from artist.tar.xz), as plain text or .gz/.bz2/.xz
+    - A JSON array of the same artist objects (handy for fixtures)
+    - TSV with a header row: name, area, area_type, aliases, spotify
+      (aliases and spotify are "|"-separated; spotify holds artist IDs or
+      open.spotify.com URLs)
+    """
+    with _open_dump(path) as f:
+        if path.name.endswith((".tsv", ".tsv.gz", ".tsv.bz2", ".tsv.xz")):
+            for row in csv.DictReader(f, delimiter="\t"):
+                aliases = [a for a in (row.get("aliases") or "").split("|") if a]
+                yield {
+                    "names": [row.get("name") or ""] + aliases,
+                    "area": row.get("area") or None,
+                    "area_type": row.get("area_type") or None,
+                    "spotify_ids": [
+                        extract_spotify_artist_id(s)
+                        for s in (row.get("spotify") or "").split("|") if s
+                    ],
+                }
+            return
+        
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            artists = json.loads(first + f.read())
+        else:
+            artists = (json.loads(line) for line in itertools.chain([first + f.readline()], f) if line.strip())
+        
+        for artist in artists:
+            area = artist.get("area") or {}
+            spotify_ids = []
+            for relation in artist.get("relations") or []:
+                resource = (relation.get("url") or {}).get("resource", "")
+                if "open.spotify.com/artist/" in resource:
+                    spotify_ids.append(extract_spotify_artist_id(resource))
+            yield {
+                "names": [artist.get("name") or ""] + [a.get("name") or "" for a in artist.get("aliases") or []],
+                "area": area.get("name"),
+                "area_type": area.get("type"),
+                "spotify_ids": spotify_ids,
+            }
+
+
+def extract_spotify_artist_id(value: str) -> str:
+    """Return the artist ID from a Spotify artist URL/URI, or the value itself."""
+    value = value.strip()
+    if "open.spotify.com/artist/" in value:
+        value = value.split("open.spotify.com/artist/", 1)[1]
+    elif value.startswith("spotify:artist:"):
+        value = value[len("spotify:artist:"):]
+    return value.split("?", 1)[0].split("/", 1)[0]
+
+
+def build_mb_index(dump_path: str) -> None:
+    """
+    Build musicbrainz-index.db from a local MusicBrainz artist dump.
     
-    Optionally includes song/album context for better disambiguation.
-    Returns normalized country name or None if lookup fails.
+    Every artist's area is stored; mirroring lookup_artist_musicbrainz, only
+    Country-type areas give a country. A name shared by artists from
+    different areas/countries (or with and without one) is stored without
+    one, so lookups for it fall through to OpenAI (which gets song context).
+    The index is built under a temporary name and swapped in at the end.
     """
+    global _mb_index, _mb_index_checked
+    path = Path(dump_path)
+    if not path.exists():
+        print(f"❌ Dump not found: {path}")
+        return
+    
+    index_path = get_mb_index_path()
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+    
+    print(f"📦 Building MusicBrainz index from {path}...")
+    conn = sqlite3.connect(str(tmp_path))
+    conn.executescript(MB_INDEX_SCHEMA)
+    conn.execute("CREATE TEMP TABLE raw_names (name TEXT, area TEXT, country TEXT)")
+    
+    artist_count = 0
+    with conn:
+        for artist in iter_mb_dump_artists(path):
+            artist_count += 1
+            area = artist["area"]
+            country = normalize_country(area) if artist["area_type"] == "Country" and area else None
+            names = {normalize_artist_name(n) for n in artist["names"] if n}
+            conn.executemany("INSERT INTO raw_names VALUES (?, ?, ?)", [(n, area, country) for n in names])
+            if area:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO spotify VALUES (?, ?, ?)",
+                    [(sid, area, country) for sid in artist["spotify_ids"] if sid],
+                )
+            if artist_count % 100_000 == 0:
+                print(f"   ...{artist_count:,} artists")
+        
+        # One row per name: its area/country if all artists with it agree
+        # (an artist without one counts as disagreeing)
+        conn.execute(
+            "INSERT INTO names "
+            "SELECT name, "
+            "CASE WHEN COUNT(DISTINCT COALESCE(area, '')) = 1 THEN MAX(area) END, "
+            "CASE WHEN COUNT(DISTINCT COALESCE(country, '')) = 1 THEN MAX(country) END "
+            "FROM raw_names GROUP BY name"
+        )
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+            ("source", str(path.resolve())),
+            ("built_at", datetime.now(timezone.utc).isoformat()),
+            ("artists", str(artist_count)),
+        ])
+    
+    name_count = conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+    spotify_count = conn.execute("SELECT COUNT(*) FROM spotify").fetchone()[0]
+    conn.execute("DROP TABLE raw_names")
+    conn.execute("VACUUM")
+    conn.close()
+    
+    with _mb_index_lock:
+        if _mb_index is not None:
+            _mb_index.close()
+        _mb_index = None
+        _mb_index_checked = False
+        tmp_path.replace(index_path)
+    
+    print(f"✅ Indexed {artist_count:,} artists: {name_count:,} names, "
+          f"{spotify_count:,} Spotify IDs → {index_path}")
+
+
+def lookup_artist_mb_index(artist_name: str, spotify_id: str = None) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Look up an artist in the offline MusicBrainz index.
+    
+    Returns {"area", "country"}, or None if there is no index or the artist
+    isn't in it (ask the live API). country is None if the dump has the
+    artist but no single Country-type area for it; area is None if it has no
+    single area.
+    """
+    global _mb_index, _mb_index_checked
+    with _mb_index_lock:
+        if not _mb_index_checked:
+            _mb_index_checked = True
+            index_path = get_mb_index_path()
+            if index_path.exists():
+                _mb_index = sqlite3.connect(
+                    f"file:{index_path}?mode=ro", uri=True, check_same_thread=False
+                )
+        if _mb_index is None:
+            return None
+        
+        if spotify_id:
+            row = _mb_index.execute(
+                "SELECT area, country FROM spotify WHERE spotify_id = ?", (spotify_id,)
+            ).fetchone()
+            if row:
+                return {"area": row[0], "country": row[1]}
+        
+        row = _mb_index.execute(
+            "SELECT area, country FROM names WHERE name = ?", (normalize_artist_name(artist_name),)
+        ).fetchone()
+        if row:
+            return {"area": row[0], "country": row[1]}
+    return None
+
+
+# =============================================================================
+# OpenAI Fallback
+# =============================================================================
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Return the shared OpenAI client, or None if OpenAI is unavailable."""
+    global _openai_client
     if not OPENAI_AVAILABLE:
         print("   ⚠️  OpenAI not available (pip install openai)")
         return None
@@ -418,9 +775,24 @@ def lookup_artist_openai(artist_name: str, song_name: str = None, album_name: st
         print("   ⚠️  OPENAI_API_KEY not set")
         return None
     
+    with _openai_client_lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key=api_key)
+    return _openai_client
+
+
+def lookup_artist_openai(artist_name: str, song_name: str = None, album_name: str = None) -> Optional[str]:
+    """
+    Look up an artist's country via OpenAI API.
+    
+    Optionally includes song/album context for better disambiguation.
+    Returns normalized country name or None if lookup fails.
+    """
+    client = get_openai_client()
+    if client is None:
+        return None
+    
     try:
-        client = OpenAI(api_key=api_key)
-        
         # Build the query with optional context
         query = f"What country is the musical artist '{artist_name}' from?"
         if song_name or album_name:
@@ -432,7 +804,7 @@ def lookup_artist_openai(artist_name: str, song_name: str = None, album_name: st
             query += f" Context: {', '.join(context_parts)}"
         
         response = client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=OPENAI_MODEL,
             messages=[
                 {
                     "role": "system",
@@ -455,10 +827,173 @@ def lookup_artist_openai(artist_name: str, song_name: str = None, album_name: st
         return None
 
 
+def lookup_artists_openai_batch(artists: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Look up many artists' countries in a single OpenAI request.
+    
+    Each artist dict has id, name and optional song_name/album_name context.
+    The artists are sent as one JSON list and the model answers with a JSON
+    object holding one country per entry, so a batch costs one round trip.
+    
+    Returns {artist id: normalized country} for the artists the model answered
+    ("Unknown" if it said it doesn't know). Artists missing from the result
+    weren't answered (the request failed, the reply was cut off or invalid, or
+    it left them out), so callers should retry them rather than cache them.
+    """
+    results: Dict[str, str] = {}
+    if not artists:
+        return results
+    
+    client = get_openai_client()
+    if client is None:
+        return results
+    
+    # Short positional keys keep the prompt small and the answer easy to match
+    entries = []
+    for i, artist in enumerate(artists):
+        entry = {"key": str(i), "artist": artist["name"]}
+        if artist.get("song_name"):
+            entry["song"] = artist["song_name"]
+        if artist.get("album_name"):
+            entry["album"] = artist["album_name"]
+        entries.append(entry)
+    
+    try:
+        response = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a music expert. You will receive a JSON list of musical artists, each with a key and optional song/album context. For each one, give the country the artist is from. If the artist is from multiple countries or you're unsure, give the primary country they're associated with. If you don't know, use 'Unknown'. Respond with ONLY a JSON object of the form {\"results\": [{\"key\": \"0\", \"country\": \"Japan\"}, ...]} with one entry per input key."
+                },
+                {
+                    "role": "user",
+                    "content": json.dumps(entries, ensure_ascii=False)
+                }
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=100 + 40 * len(artists),
+            temperature=0
+        )
+        
+        answer = json.loads(response.choices[0].message.content)
+        for item in answer.get("results", []):
+            try:
+                artist = artists[int(item.get("key"))]
+            except (TypeError, ValueError, IndexError):
+                continue
+            country = item.get("country")
+            if isinstance(country, str) and country.strip():
+                results[artist["id"]] = normalize_country(country.strip())
+        
+    except Exception as e:
+        print(f"   ⚠️  OpenAI batch error: {e}")
+    
+    return results
+
+
 # =============================================================================
 # Artist Country Resolution
 # =============================================================================
 
+def make_artist_cache_entry(artist_name: str, country: Optional[str], source: str) -> Dict[str, Any]:
+    """Build an artist-cache record for a lookup result."""
+    return {
+        "name": artist_name,
+        "country": country or "Unknown",
+        "source": source,
+        "cached_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def resolve_artist_countries(
+    artists: List[Dict[str, Any]],
+    use_openai: bool = True,
+    openai_only: bool = False,
+) -> Iterator[Tuple[Dict[str, Any], str, str]]:
+    """
+    Resolve many artists concurrently, yielding results as they complete.
+    
+    Each artist dict has id, name and optional song_name/album_name context.
+    MusicBrainz lookups run on MUSICBRAINZ_WORKERS threads sharing one token
+    bucket (so the request rate stays at MUSICBRAINZ_RATE_LIMIT while network
+    latency overlaps the waits). Misses are queued for OpenAI and sent in
+    batches of OPENAI_BATCH_SIZE on a separate pool, so fallbacks run during
+    the MusicBrainz waits.
+    
+    Yields (artist, country, source) tuples; country is "Unknown" (source
+    "unknown") if no lookup succeeded, or source "deferred" if MusicBrainz was
+    unavailable or OpenAI didn't answer for the artist (don't cache these;
+    retry on a later run). Results are yielded on the caller's thread, so the
+    caller can update the cache without locking.
+    """
+    if use_openai and get_openai_client() is None:
+        # No API key or package: nothing to retry later, same as OpenAI off
+        use_openai = False
+    mb_pool = ThreadPoolExecutor(max_workers=MUSICBRAINZ_WORKERS)
+    ai_pool = ThreadPoolExecutor(max_workers=OPENAI_WORKERS)
+    # future -> ("musicbrainz", artist) or ("openai", [artists])
+    stages: Dict[Future, Tuple[str, Any]] = {}
+    openai_queue: List[Dict[str, Any]] = []
+    musicbrainz_pending = 0
+    
+    def submit_openai_batch() -> None:
+        batch = openai_queue[:OPENAI_BATCH_SIZE]
+        del openai_queue[:OPENAI_BATCH_SIZE]
+        stages[ai_pool.submit(lookup_artists_openai_batch, batch)] = ("openai", batch)
+    
+    try:
+        for artist in artists:
+            if not openai_only:
+                future = mb_pool.submit(lookup_artist_musicbrainz, artist["name"], artist["id"])
+                stages[future] = ("musicbrainz", artist)
+                musicbrainz_pending += 1
+            elif use_openai:
+                openai_queue.append(artist)
+            else:
+                yield artist, "Unknown", "unknown"
+        
+        while stages or openai_queue:
+            # Send full batches right away, and the last partial batch once no
+            # more MusicBrainz misses can arrive
+            while len(openai_queue) >= OPENAI_BATCH_SIZE or (openai_queue and not musicbrainz_pending):
+                submit_openai_batch()
+            
+            done, _ = wait(list(stages), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, payload = stages.pop(future)
+                
+                if stage == "openai":
+                    countries = future.result()
+                    for artist in payload:
+                        country = countries.get(artist["id"])
+                        if country is None:
+                            # Not answered (e.g. request error): retry on a later run
+                            yield artist, "Unknown", "deferred"
+                        elif country != "Unknown":
+                            yield artist, country, "openai"
+                        else:
+                            yield artist, "Unknown", "unknown"
+                    continue
+                
+                musicbrainz_pending -= 1
+                artist = payload
+                try:
+                    country = future.result()
+                except MusicBrainzUnavailable:
+                    yield artist, "Unknown", "deferred"
+                    continue
+                if country and country != "Unknown":
+                    yield artist, country, "musicbrainz"
+                elif use_openai:
+                    openai_queue.append(artist)
+                else:
+                    yield artist, "Unknown", "unknown"
+    finally:
+        mb_pool.shutdown(wait=False, cancel_futures=True)
+        ai_pool.shutdown(wait=False, cancel_futures=True)
+
+
 def get_artist_country(
     artist_id: str,
     artist_name: str,
@@ -475,7 +1010,8 @@ def get_artist_country(
     If openai_only is True, skips MusicBrainz and goes straight to OpenAI.
     song_name and album_name provide context for better OpenAI disambiguation.
     
-    Returns (country, source) tuple.
+    Returns (country, source) tuple. If MusicBrainz is unavailable, returns
+    ("Unknown", "deferred") without caching or falling back to OpenAI.
     """
     # Check cache first
     if artist_id in cache:
@@ -490,7 +1026,12 @@ def get_artist_country(
     
     # Try MusicBrainz first (unless openai_only)
     if not openai_only:
-        country = lookup_artist_musicbrainz(artist_name, artist_id)
+        try:
+            country = lookup_artist_musicbrainz(artist_name, artist_id)
+        except MusicBrainzUnavailable as e:
+            if verbose:
+                print(f"      → deferred (MusicBrainz unavailable: {e})")
+            return "Unknown", "deferred"
         if country and country != "Unknown":
             source = "musicbrainz"
             if verbose:
@@ -514,13 +1055,7 @@ def get_artist_country(
             print(f"      → Unknown (MusicBrainz only)")
     
     # Cache the result
-    cache[artist_id] = {
-        "name": artist_name,
-        "country": country or "Unknown",
-        "source": source,
-        "cached_at": datetime.now(timezone.utc).isoformat()
-    }
-    save_artist_cache(cache)
+    cache_artist_country(cache, artist_id, make_artist_cache_entry(artist_name, country, source))
     
     return country or "Unknown", source
 
@@ -569,13 +1104,20 @@ def process_liked_songs(
     dry_run: bool = False,
     use_openai: bool = True,
     openai_only: bool = False,
-    verbose: bool = False
+    verbose: bool = False,
+    full_sync: bool = False
 ) -> Dict[str, int]:
     """
     Process liked songs and add to country playlists.
     
     If openai_only is True, skips MusicBrainz and uses OpenAI for all lookups.
     
+    Only songs added since the stored watermark are considered, except on a
+    full sync (full_sync=True, no watermark yet, or FULL_SYNC_INTERVAL_DAYS
+    since the last one), which reads the whole library and drops songs that
+    are no longer liked from the processed list, so they're sorted again if
+    re-liked. full_sync=True also re-fetches the Liked Songs mirror.
+    
     Returns dict of {country: num_songs_added}.
     """
     # Load state
@@ -584,27 +1126,90 @@ def process_liked_songs(
     processed_set = set(processed_data.get("processed", []))
     playlist_ids = load_playlist_ids()
     
-    # Fetch all liked songs
-    all_songs = fetch_all_liked_songs(sp)
+    # Fetch liked songs (all of them on a full sync; --full-sync also
+    # re-fetches the whole library from Spotify into the mirror)
+    refetch = full_sync
+    full_sync = full_sync or full_sync_due(processed_data)
+    watermark = processed_data.get("watermark")
+    all_songs = fetch_all_liked_songs(sp, since=None if full_sync else watermark, full=refetch)
+    
+    if full_sync:
+        liked_ids = {s["track_id"] for s in all_songs}
+        removed = len(processed_set - liked_ids)
+        if removed:
+            print(f"   🧹 {removed} processed songs are no longer liked")
+            processed_set &= liked_ids
     
     # Filter to unprocessed songs
     new_songs = [s for s in all_songs if s["track_id"] not in processed_set]
     
+    def save_sync_state(deferred: List[Dict[str, Any]]) -> None:
+        # The watermark only moves past a song once it has been processed
+        added = [s["added_at"] for s in (deferred or all_songs) if s.get("added_at")]
+        if added:
+            processed_data["watermark"] = min(added) if deferred else max(added)
+        elif deferred:
+            processed_data.pop("watermark", None)
+        if full_sync:
+            processed_data["last_full_sync"] = datetime.now(timezone.utc).isoformat()
+        processed_data["processed"] = list(processed_set)
+        processed_data["last_run"] = datetime.now(timezone.utc).isoformat()
+        save_processed_songs(processed_data)
+    
     if not new_songs:
         print("✅ No new songs to process")
+        if not dry_run:
+            save_sync_state([])
         return {}
     
     print(f"\n🎵 Processing {len(new_songs)} new songs...")
     if openai_only:
         print("   (Using OpenAI only - skipping MusicBrainz)")
     
+    # Resolve every uncached artist up front, concurrently. The first song an
+    # artist appears on provides the context for OpenAI disambiguation.
+    to_resolve: Dict[str, Dict[str, Any]] = {}
+    for song in new_songs:
+        for artist in song["artists"]:
+            if artist["id"] not in artist_cache and artist["id"] not in to_resolve:
+                to_resolve[artist["id"]] = {
+                    "id": artist["id"],
+                    "name": artist["name"],
+                    "song_name": song.get("track_name"),
+                    "album_name": song.get("album_name"),
+                }
+    
+    deferred_artist_ids: Set[str] = set()
+    if to_resolve:
+        print(f"   🔍 Looking up {len(to_resolve)} new artists...")
+        resolved = resolve_artist_countries(
+            list(to_resolve.values()), use_openai=use_openai, openai_only=openai_only
+        )
+        for i, (artist, country, source) in enumerate(resolved, 1):
+            if source == "deferred":
+                deferred_artist_ids.add(artist["id"])
+            else:
+                cache_artist_country(
+                    artist_cache, artist["id"], make_artist_cache_entry(artist["name"], country, source)
+                )
+            if verbose:
+                print(f"   [{i}/{len(to_resolve)}] {artist['name']} → {country} ({source})")
+            elif i % 50 == 0:
+                print(f"   ...looked up {i}/{len(to_resolve)} artists")
+    
     # Group songs by country
     country_to_tracks: Dict[str, List[str]] = {}
+    deferred_songs: List[Dict[str, Any]] = []
     
     for i, song in enumerate(new_songs, 1):
         if verbose or i % 50 == 0:
             print(f"   [{i}/{len(new_songs)}] {song['track_name']}")
         
+        # Leave songs with an unresolved artist unprocessed; next run retries them
+        if any(a["id"] in deferred_artist_ids for a in song["artists"]):
+            deferred_songs.append(song)
+            continue
+        
         countries = determine_countries_for_track(
             song, 
             artist_cache, 
@@ -621,6 +1226,13 @@ def process_liked_songs(
         # Mark as processed (even if Unknown)
         processed_set.add(song["track_id"])
     
+    # Fold this run's journaled lookups into artist-countries.json
+    save_artist_cache(artist_cache)
+    
+    if deferred_songs:
+        print(f"   ⏸️  Deferred {len(deferred_songs)} songs ({len(deferred_artist_ids)} artists): "
+              f"lookup service unavailable, will retry next run")
+    
     # Add tracks to playlists
     results = {}
     
@@ -650,10 +1262,8 @@ def process_liked_songs(
             else:
                 print(f"   ✓ {country}: no new songs (already in playlist)")
         
-        # Save processed songs
-        processed_data["processed"] = list(processed_set)
-        processed_data["last_run"] = datetime.now(timezone.utc).isoformat()
-        save_processed_songs(processed_data)
+        # Save processed songs and the sync watermark
+        save_sync_state(deferred_songs)
     
     return results
 
@@ -703,28 +1313,7 @@ def generate_country_report(sp, output_file: str) -> None:
         return
     
     # Fetch all liked songs with duration
-    print("   Fetching liked songs...")
-    songs = []
-    offset = 0
-    while True:
-        results = sp.current_user_saved_tracks(limit=50, offset=offset)
-        items = results.get('items', [])
-        if not items:
-            break
-        for item in items:
-            track = item.get('track')
-            if track and track.get('id'):
-                songs.append({
-                    'track_id': track['id'],
-                    'track_name': track['name'],
-                    'duration_ms': track.get('duration_ms', 0),
-                    'artists': [{'id': a['id'], 'name': a['name']} for a in track.get('artists', [])]
-                })
-        offset += 50
-        if len(items) < 50:
-            break
-    
-    print(f"   Found {len(songs)} songs")
+    songs = fetch_all_liked_songs(sp)
     
     # Calculate stats per country
     country_stats = defaultdict(lambda: {'artists': set(), 'songs': 0, 'duration_ms': 0})
@@ -800,6 +1389,7 @@ def show_status(sp) -> None:
     # Last run
     last_run = processed_data.get("last_run", "Never")
     print(f"Last run: {last_run}")
+    print(f"Last full sync: {processed_data.get('last_full_sync', 'Never')}")
     
     # Processed songs
     processed_count = len(processed_data.get("processed", []))
@@ -831,8 +1421,8 @@ def show_status(sp) -> None:
     for country in sorted(playlist_ids.keys()):
         print(f"   • Liked Songs - {country}")
     
-    # Check for new songs
-    all_songs = fetch_all_liked_songs(sp)
+    # Check for new songs (since the watermark, like a normal run)
+    all_songs = fetch_all_liked_songs(sp, since=processed_data.get("watermark"))
     processed_set = set(processed_data.get("processed", []))
     new_count = sum(1 for s in all_songs if s["track_id"] not in processed_set)
     print(f"\nNew songs to process: {new_count}")
@@ -845,11 +1435,14 @@ def lookup_artist_cli(artist_name: str, use_openai: bool = True) -> None:
     
     # Try MusicBrainz
     print("MusicBrainz:")
-    country = lookup_artist_musicbrainz(artist_name)
-    if country:
-        print(f"   → {country}")
-    else:
-        print("   → Not found")
+    try:
+        country = lookup_artist_musicbrainz(artist_name)
+        if country:
+            print(f"   → {country}")
+        else:
+            print("   → Not found")
+    except MusicBrainzUnavailable as e:
+        print(f"   → Unavailable ({e})")
     
     # Try OpenAI
     if use_openai:
@@ -903,6 +1496,21 @@ def fix_cache(use_openai: bool = True, verbose: bool = False) -> None:
     print(f"\n🔍 Re-looking up {len(needs_fix)} artists...")
     
     fixed = 0
+    
+    def apply_fix(artist_id: str, data: Dict[str, Any], new_country: Optional[str]) -> None:
+        nonlocal fixed
+        if new_country and new_country != data.get("country", ""):
+            cache_artist_country(cache, artist_id, {
+                **data,
+                "country": new_country,
+                "source": "musicbrainz" if new_country != "Unknown" else "unknown",
+                "cached_at": datetime.now(timezone.utc).isoformat(),
+            })
+            fixed += 1
+            if verbose:
+                print(f"      → {data.get('name', '')}: {new_country}")
+    
+    openai_fallback: List[Tuple[str, Dict[str, Any]]] = []
     for i, (artist_id, data) in enumerate(needs_fix, 1):
         artist_name = data.get("name", "")
         old_country = data.get("country", "")
@@ -911,19 +1519,29 @@ def fix_cache(use_openai: bool = True, verbose: bool = False) -> None:
             print(f"   [{i}/{len(needs_fix)}] {artist_name} (was: {old_country})")
         
         # Try MusicBrainz again (now with city→country lookup)
-        new_country = lookup_artist_musicbrainz(artist_name)
+        try:
+            new_country = lookup_artist_musicbrainz(artist_name)
+        except MusicBrainzUnavailable:
+            if verbose:
+                print("      → skipped (MusicBrainz unavailable)")
+            continue
         
-        # If still not found and OpenAI enabled, try that
+        # If still not found and OpenAI enabled, try that (batched below)
         if (not new_country or new_country == old_country) and use_openai:
-            new_country = lookup_artist_openai(artist_name)
+            openai_fallback.append((artist_id, data))
+            continue
         
-        if new_country and new_country != old_country:
-            cache[artist_id]["country"] = new_country
-            cache[artist_id]["source"] = "musicbrainz" if new_country != "Unknown" else "unknown"
-            cache[artist_id]["cached_at"] = datetime.now(timezone.utc).isoformat()
-            fixed += 1
-            if verbose:
-                print(f"      → {new_country}")
+        apply_fix(artist_id, data, new_country)
+    
+    if openai_fallback:
+        print(f"\n🤖 Asking OpenAI about {len(openai_fallback)} artists...")
+        for start in range(0, len(openai_fallback), OPENAI_BATCH_SIZE):
+            chunk = openai_fallback[start:start + OPENAI_BATCH_SIZE]
+            countries = lookup_artists_openai_batch(
+                [{"id": artist_id, "name": data.get("name", "")} for artist_id, data in chunk]
+            )
+            for artist_id, data in chunk:
+                apply_fix(artist_id, data, countries.get(artist_id))
     
     save_artist_cache(cache)
     print(f"\n✅ Fixed {fixed} entries")
@@ -958,6 +1576,13 @@ def main() -> int:
         action="store_true",
         help="Re-lookup cached entries that are cities instead of countries"
     )
+    parser.add_argument(
+        "--build-mb-index",
+        type=str,
+        metavar="DUMP",
+        help="Build the offline MusicBrainz artist index from a local dump "
+             "(JSON Lines artist dump, JSON array, or TSV; optionally .gz/.bz2/.xz)"
+    )
     parser.add_argument(
         "--no-openai",
         action="store_true",
@@ -968,6 +1593,12 @@ def main() -> int:
         action="store_true",
         help="Skip MusicBrainz, use OpenAI for all lookups (more accurate but costs ~$0.02)"
     )
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help=f"Fetch the whole Liked Songs library instead of just songs added since "
+             f"the last run (done automatically every {FULL_SYNC_INTERVAL_DAYS} days)"
+    )
     parser.add_argument(
         "--clear-playlists",
         action="store_true",
@@ -989,6 +1620,9 @@ def main() -> int:
     
     args = parser.parse_args()
     
+    # Journal any artist lookups still pending if we exit early
+    atexit.register(flush_artist_cache)
+    
     # Load environment
     load_env()
     
@@ -997,9 +1631,15 @@ def main() -> int:
         lookup_artist_cli(args.lookup_artist, use_openai=not args.no_openai)
         return 0
     
+    # Handle --build-mb-index (doesn't need Spotify auth)
+    if args.build_mb_index:
+        build_mb_index(args.build_mb_index)
+        return 0
+    
     # Handle --fix-cache (doesn't need Spotify auth)
     if args.fix_cache:
-        fix_cache(use_openai=not args.no_openai, verbose=args.verbose)
+        with state_lock(get_state_lock_path()):
+            fix_cache(use_openai=not args.no_openai, verbose=args.verbose)
         return 0
     
     # Get Spotify client (needed for remaining commands)
@@ -1018,7 +1658,8 @@ def main() -> int:
     
     # Handle --clear-playlists
     if args.clear_playlists:
-        clear_country_playlists(sp)
+        with state_lock(get_state_lock_path()):
+            clear_country_playlists(sp)
         return 0
     
     # Handle --report
@@ -1031,15 +1672,23 @@ def main() -> int:
         show_status(sp)
         return 0
     
-    # Default: process songs
+    # Default: process songs (skipped if a previous run, e.g. an overlapping
+    # cron job, is still sorting)
     try:
-        results = process_liked_songs(
-            sp,
-            dry_run=args.dry_run,
-            use_openai=not args.no_openai,
-            openai_only=args.openai_only,
-            verbose=args.verbose
-        )
+        with state_lock(get_state_lock_path(), blocking=False) as locked:
+            if not locked:
+                print("⏭ Another run is already sorting this profile's Liked Songs; skipping")
+                return 0
+            results = process_liked_songs(
+                sp,
+                dry_run=args.dry_run,
+                use_openai=not args.no_openai,
+                openai_only=args.openai_only,
+                verbose=args.verbose,
+                full_sync=args.full_sync
+            )
+            # Journal pending lookups while still holding the lock
+            flush_artist_cache()
         
         if results:
             total = sum(results.values())
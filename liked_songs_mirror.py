@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Local mirror of the user's Liked Songs, shared by both tools.
+
+song_of_the_day.py (songs liked today, Liked Songs fallback) and
+liked_songs_by_country.py (sorting, report, status) all need the Liked Songs
+library. Instead of each paging through /me/tracks, they sync this mirror and
+query it. The mirror is a SQLite table in liked-songs.db under the profile's
+state directory (see spotify_auth.get_state_dir).
+
+Syncing is incremental: /me/tracks is ordered newest first, so only songs
+added since the newest mirrored added_at are fetched. The first page also
+reports the library total; if the mirror's count disagrees afterwards (songs
+were unliked), or the last full sync is older than FULL_SYNC_INTERVAL_DAYS,
+the whole library is re-fetched and the mirror replaced.
+
+API access is passed in as fetch_page(offset, limit) -> paging object, so each
+tool can wrap the call in its own retry logic.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from spotify_auth import get_state_dir
+from spotify_paging import fetch_all_items
+
+PAGE_LIMIT = 50  # /me/tracks maximum
+FULL_SYNC_INTERVAL_DAYS = 7  # re-fetch everything at least this often
+SYNC_MAX_AGE_SECONDS = 60.0  # ensure_synced skips syncing again within this
+
+MIRROR_SCHEMA = """
+CREATE TABLE IF NOT EXISTS liked_songs (
+    track_id TEXT PRIMARY KEY,
+    added_at TEXT NOT NULL,
+    track_name TEXT,
+    album_name TEXT,
+    artists TEXT,          -- JSON list of {"id", "name"}
+    duration_ms INTEGER,
+    type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_liked_songs_added_at ON liked_songs (added_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+SONG_COLUMNS = ("track_id", "added_at", "track_name", "album_name", "artists", "duration_ms", "type")
+
+FetchPage = Callable[[int, int], Dict[str, Any]]
+
+_last_sync: Dict[str, float] = {}  # db path -> time.time() of last sync in this process
+
+
+def get_mirror_path() -> Path:
+    return get_state_dir() / "liked-songs.db"
+
+
+def open_mirror() -> sqlite3.Connection:
+    """Open (creating if needed) the mirror database."""
+    conn = sqlite3.connect(str(get_mirror_path()), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(MIRROR_SCHEMA)
+    return conn
+
+
+def song_from_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a saved-track item to a song dict, or None for unavailable tracks."""
+    track = item.get("track")
+    if not track or not track.get("id") or not item.get("added_at"):
+        return None
+    return {
+        "track_id": track["id"],
+        "added_at": item["added_at"],
+        "track_name": track.get("name", "Unknown"),
+        "album_name": (track.get("album") or {}).get("name"),
+        "artists": [
+            {"id": a.get("id"), "name": a.get("name", "?")}
+            for a in track.get("artists", [])
+        ],
+        "duration_ms": track.get("duration_ms", 0),
+        "type": track.get("type", "track"),
+    }
+
+
+def _song_row(song: Dict[str, Any]) -> tuple:
+    return tuple(
+        json.dumps(song["artists"], ensure_ascii=False) if c == "artists" else song.get(c)
+        for c in SONG_COLUMNS
+    )
+
+
+def _row_song(row: sqlite3.Row) -> Dict[str, Any]:
+    song = dict(row)
+    song["artists"] = json.loads(song["artists"] or "[]")
+    return song
+
+
+def _upsert(conn: sqlite3.Connection, songs: List[Dict[str, Any]]) -> None:
+    conn.executemany(
+        f"INSERT OR REPLACE INTO liked_songs ({', '.join(SONG_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in SONG_COLUMNS)})",
+        [_song_row(s) for s in songs],
+    )
+
+
+def _get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _full_sync(conn: sqlite3.Connection, fetch_page: FetchPage, verbose: bool) -> int:
+    if verbose:
+        print("📚 Fetching all Liked Songs...")
+    items = fetch_all_items(fetch_page, limit=PAGE_LIMIT)
+    songs = [song for song in map(song_from_item, items) if song]
+    with conn:
+        conn.execute("DELETE FROM liked_songs")
+        _upsert(conn, songs)
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+            ("last_full_sync", datetime.now(timezone.utc).isoformat()),
+            # Items without a track (local files, removed tracks) count toward
+            # the library total but aren't mirrored
+            ("unmirrored", str(len(items) - len(songs))),
+        ])
+    if verbose:
+        print(f"   ✓ Mirrored {len(songs)} Liked Songs")
+    return len(songs)
+
+
+def _sync(conn: sqlite3.Connection, fetch_page: FetchPage, full: bool, verbose: bool) -> int:
+    watermark = conn.execute("SELECT MAX(added_at) FROM liked_songs").fetchone()[0]
+    last_full_sync = _get_meta(conn, "last_full_sync")
+    due = (
+        not last_full_sync
+        or datetime.now(timezone.utc) - datetime.fromisoformat(last_full_sync)
+        >= timedelta(days=FULL_SYNC_INTERVAL_DAYS)
+    )
+    if full or not watermark or due:
+        return _full_sync(conn, fetch_page, verbose)
+
+    songs: List[Dict[str, Any]] = []
+    total = None
+    offset = 0
+    while True:
+        page = fetch_page(offset, PAGE_LIMIT)
+        if total is None:
+            total = page.get("total")
+        items = page.get("items") or []
+        reached_watermark = False
+        for item in items:
+            if item.get("added_at") and item["added_at"] < watermark:
+                reached_watermark = True
+                break
+            song = song_from_item(item)
+            if song:
+                songs.append(song)
+        offset += PAGE_LIMIT
+        if reached_watermark or len(items) < PAGE_LIMIT:
+            break
+
+    # Songs liked at the watermark itself are fetched again; drop them
+    mirrored = {
+        row[0] for row in conn.execute(
+            "SELECT track_id FROM liked_songs WHERE added_at >= ?", (watermark,)
+        )
+    }
+    songs = [song for song in songs if song["track_id"] not in mirrored]
+    with conn:
+        _upsert(conn, songs)
+    count = conn.execute("SELECT COUNT(*) FROM liked_songs").fetchone()[0]
+    unmirrored = int(_get_meta(conn, "unmirrored") or 0)
+    if total is not None and count + unmirrored != total:
+        # Songs were unliked since the last sync; start over
+        return _full_sync(conn, fetch_page, verbose)
+    if verbose and songs:
+        print(f"📚 Synced {len(songs)} new Liked Songs")
+    return len(songs)
+
+
+def sync_liked_songs(fetch_page: FetchPage, full: bool = False, verbose: bool = True) -> int:
+    """
+    Bring the mirror up to date.
+
+    Fetches only songs added since the newest mirrored one, unless full is
+    True, the mirror is empty, a full sync is due, or the library total shows
+    songs were removed.
+
+    Returns the number of songs newly mirrored.
+    """
+    started = time.time()
+    with closing(open_mirror()) as conn:
+        count = _sync(conn, fetch_page, full, verbose)
+    # Only a completed sync lets ensure_synced skip the next one
+    _last_sync[str(get_mirror_path())] = started
+    return count
+
+
+def ensure_synced(fetch_page: FetchPage, verbose: bool = False) -> None:
+    """Sync the mirror unless this process already did so in the last SYNC_MAX_AGE_SECONDS."""
+    last = _last_sync.get(str(get_mirror_path()))
+    if last is None or time.time() - last >= SYNC_MAX_AGE_SECONDS:
+        sync_liked_songs(fetch_page, verbose=verbose)
+
+
+def get_liked_songs(since: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Mirrored Liked Songs, newest first.
+
+    since: only songs with added_at >= this (ISO 8601 prefix, e.g. a date)
+    limit: at most this many songs
+    """
+    query = f"SELECT {', '.join(SONG_COLUMNS)} FROM liked_songs"
+    params: List[Any] = []
+    if since:
+        query += " WHERE added_at >= ?"
+        params.append(since)
+    query += " ORDER BY added_at DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with closing(open_mirror()) as conn:
+        return [_row_song(row) for row in conn.execute(query, params)]
+
+
+def sample_liked_songs(n: int) -> List[Dict[str, Any]]:
+    """A uniform random sample of up to n mirrored Liked Songs."""
+    with closing(open_mirror()) as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(SONG_COLUMNS)} FROM liked_songs ORDER BY RANDOM() LIMIT ?", (n,)
+        )
+        return [_row_song(row) for row in rows]
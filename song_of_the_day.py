@@ -15,6 +15,7 @@ Usage:
     song_of_the_day.py --finalize          # Nightly: ensure correct song count
     song_of_the_day.py --status            # Show playlist status and targets
     song_of_the_day.py --dry-run           # Test finalize without adding
+    song_of_the_day.py --daemon            # Long-running poller (replaces --poll cron)
 
 Polling:
     The --poll mode captures listening from two sources:
@@ -23,6 +24,10 @@ Polling:
     
     For best coverage (especially with Jams), run every 1-5 minutes via cron:
         * * * * * /path/to/python /path/to/song_of_the_day.py --poll -q
+    
+    Or run --daemon under systemd/supervisor instead. It keeps one authenticated
+    client and the day's log in memory, polls every poll_interval_seconds, and
+    exits cleanly on SIGTERM.
 
 Configuration:
     Edit ~/.spotify-tools/config.json to customize playlist name, timezone, etc.
@@ -33,17 +38,23 @@ Configuration:
 from __future__ import annotations
 
 import argparse
+import atexit
+import calendar
 import json
 import random
+import signal
 import smtplib
+import sqlite3
 import ssl
 import sys
+import threading
 import traceback
+from collections import deque
 from datetime import datetime, date, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Container, Dict, List, Optional, Tuple
 
 import time
 
@@ -61,6 +72,9 @@ from spotify_auth import (
     set_profile,
     get_profile,
 )
+from liked_songs_mirror import ensure_synced, get_liked_songs, sample_liked_songs
+from spotify_paging import fetch_all_items
+from state_io import append_jsonl, read_jsonl, state_lock, write_json_atomic, write_jsonl_atomic
 
 
 def _is_invalid_grant(exc: Exception) -> bool:
@@ -114,7 +128,7 @@ def retry_on_timeout(func, retries: int = 3, delay: float = 2.0):
     Retry a function on transient network errors (timeouts, connection errors,
     Spotify OAuth 503/unavailable during token refresh, server 5xx).
     
-    Logs each retry attempt to retry-log.json for weekly summary reporting.
+    Logs each retry attempt (see record_retry) for weekly summary reporting.
     
     Returns the function result, or raises the last exception if all retries fail.
     """
@@ -157,6 +171,8 @@ DEFAULT_CONFIG = {
     # Year start date: first day of the playlist year (inferred from playlist name if not set)
     # Format: "YYYY-MM-DD" e.g. "2026-01-01"
     "year_start_date": None,
+    # Seconds between polls in --daemon mode (cron --poll ignores this)
+    "poll_interval_seconds": 60,
     # Email settings (optional - notifications disabled if not configured)
     "email_enabled": False,
     "email_to": None,  # Recipient address
@@ -195,8 +211,7 @@ def save_config(config: Dict[str, Any]) -> None:
     """Save config to file."""
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(config, f, indent=2)
+    write_json_atomic(config_path, config)
 
 
 # =============================================================================
@@ -206,14 +221,14 @@ def save_config(config: Dict[str, Any]) -> None:
 import re
 
 
-def get_year_start_date(config: Dict[str, Any]) -> date:
+def get_year_start_date(config: Dict[str, Any], now: Optional[datetime] = None) -> date:
     """
     Get the date that corresponds to day 1 of the playlist.
     
     Priority:
     1. Explicit year_start_date in config
     2. Year parsed from playlist name (e.g., "Songs of the Day 2026" → Jan 1, 2026)
-    3. Current year
+    3. Current year (of `now`, if given)
     """
     # Check for explicit config
     if config.get("year_start_date"):
@@ -227,20 +242,25 @@ def get_year_start_date(config: Dict[str, Any]) -> date:
         return date(year, 1, 1)
     
     # Default to current year
-    tz = pytz.timezone(config.get("timezone", "America/New_York"))
-    return date(datetime.now(tz).year, 1, 1)
+    if now is None:
+        tz = pytz.timezone(config.get("timezone", "America/New_York"))
+        now = datetime.now(tz)
+    return date(now.year, 1, 1)
 
 
-def get_effective_date(config: Dict[str, Any]) -> date:
+def get_effective_date(config: Dict[str, Any], now: Optional[datetime] = None) -> date:
     """
     Get the "effective date" for playlist targeting.
     
     If running before day_boundary_hour (default 4am), considers it
     still "yesterday" for targeting purposes. This handles night owls
     who stay up past midnight.
+    
+    now: local time to evaluate (default: the current time)
     """
-    tz = pytz.timezone(config["timezone"])
-    now = datetime.now(tz)
+    if now is None:
+        tz = pytz.timezone(config["timezone"])
+        now = datetime.now(tz)
     
     day_boundary_hour = config.get("day_boundary_hour", 4)
     
@@ -251,15 +271,15 @@ def get_effective_date(config: Dict[str, Any]) -> date:
         return now.date()
 
 
-def get_target_song_count(config: Dict[str, Any]) -> int:
+def get_target_song_count(config: Dict[str, Any], now: Optional[datetime] = None) -> int:
     """
     Calculate target number of songs based on day of year.
     
     Returns the number of songs the playlist should have after the
     effective date. E.g., after Jan 3 → 3 songs.
     """
-    effective_date = get_effective_date(config)
-    year_start = get_year_start_date(config)
+    effective_date = get_effective_date(config, now)
+    year_start = get_year_start_date(config, now)
     
     # Calculate days since year start (1-indexed)
     # Jan 1 = day 1 → 1 song
@@ -270,6 +290,50 @@ def get_target_song_count(config: Dict[str, Any]) -> int:
     return max(0, days_elapsed)
 
 
+# =============================================================================
+# Run Context
+# =============================================================================
+
+def get_run_context(config: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Read the clock once for a run and resolve everything derived from it.
+    
+    Commands pass the context down instead of each step calling datetime.now()
+    and re-deriving the date, so a run that crosses midnight or
+    day_boundary_hour still works on a single day throughout (e.g. finalize
+    can't record additions for one date while selecting from another day's
+    listening history).
+    
+    now: time to evaluate (default: the current time)
+    
+    Returns dict with:
+        - tz: the configured timezone
+        - now: local time of the run
+        - now_utc: the same instant in UTC
+        - today: local calendar date
+        - effective_date: date for playlist targeting (see get_effective_date)
+        - year_start: day 1 of the playlist
+        - day_number: effective_date's day number (1-indexed)
+        - target_count: songs the playlist should have (see get_target_song_count)
+    """
+    tz = pytz.timezone(config["timezone"])
+    now = datetime.now(tz) if now is None else now.astimezone(tz)
+    effective_date = get_effective_date(config, now)
+    year_start = get_year_start_date(config, now)
+    day_number = (effective_date - year_start).days + 1
+    
+    return {
+        "tz": tz,
+        "now": now,
+        "now_utc": now.astimezone(pytz.UTC),
+        "today": now.date(),
+        "effective_date": effective_date,
+        "year_start": year_start,
+        "day_number": day_number,
+        "target_count": get_target_song_count(config, now),
+    }
+
+
 # =============================================================================
 # Email Notifications
 # =============================================================================
@@ -500,6 +564,8 @@ def send_nightly_email(
     listened_candidates: Optional[List[Dict[str, Any]]] = None,
     play_counts: Optional[Dict[str, int]] = None,
     all_listened_songs: Optional[List[Dict[str, Any]]] = None,
+    cooldown_tracker: Optional[CooldownTracker] = None,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     Send a nightly summary email after finalize runs.
@@ -516,10 +582,14 @@ def send_nightly_email(
         listened_candidates: Songs from listening history that were eligible candidates
         play_counts: Dict of track_id -> play count
         all_listened_songs: All songs listened to that day
+        cooldown_tracker: The playlist snapshot's CooldownTracker, if recent_tracks
+                          is that snapshot's track list (saves rebuilding it)
         print_email: If True, print subject + plain/HTML bodies to stdout (still sends if email_enabled)
+        ctx: The run's context from get_run_context (built here if not given)
     """
+    ctx = ctx or get_run_context(config)
     playlist_name = config.get('playlist_name', 'Song of the Day')
-    year_start = get_year_start_date(config)
+    year_start = ctx["year_start"]
     day_number = (effective_date - year_start).days + 1
     
     # Format profile prefix for subject
@@ -554,8 +624,7 @@ def send_nightly_email(
         listened_candidates = []
     
     # Load additions log to determine auto vs user-added for recent songs
-    additions_log = load_additions_log()
-    auto_added_ids = {a["track_id"] for a in additions_log if a.get("source") == "auto"}
+    auto_added_ids = get_auto_added_ids()
     
     # Build plain text body
     lines = [
@@ -587,7 +656,7 @@ def send_nightly_email(
         
         cooldown_n = config.get("cooldown_entries", 90)
         cd_violations = find_cooldown_violations_in_tail(
-            recent_tracks, cooldown_n, tail=5
+            recent_tracks, cooldown_n, tail=5, tracker=cooldown_tracker
         )
         if cd_violations:
             lines.append("")
@@ -702,7 +771,7 @@ def send_nightly_email(
         html_lines.append("</table>")
         cooldown_n = config.get("cooldown_entries", 90)
         cd_violations = find_cooldown_violations_in_tail(
-            recent_tracks, cooldown_n, tail=5
+            recent_tracks, cooldown_n, tail=5, tracker=cooldown_tracker
         )
         if cd_violations:
             for v in cd_violations:
@@ -809,66 +878,614 @@ def send_nightly_email(
     send_email(config, subject, body, html_body, from_name="Song of the Day")
 
 
+# =============================================================================
+# SQLite State Store (optional)
+# =============================================================================
+#
+# By default all state lives in JSON files under the state directory. Running
+# --migrate-state imports them into state.db (SQLite, WAL mode); from then on
+# the load_*/save_*/record_* helpers below read and write indexed tables
+# instead of loading and rewriting whole files. config.json stays a plain file
+# because it is edited by hand.
+
+STATE_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    day TEXT NOT NULL,
+    played_at TEXT NOT NULL,
+    played_at_ms INTEGER,
+    track_id TEXT NOT NULL,
+    track_name TEXT,
+    artist TEXT,
+    duration_ms INTEGER,
+    type TEXT,
+    context_type TEXT,
+    source TEXT,
+    UNIQUE (day, played_at, track_id)
+);
+CREATE INDEX IF NOT EXISTS idx_plays_day ON plays (day);
+CREATE INDEX IF NOT EXISTS idx_plays_track_day ON plays (track_id, day);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    track_id TEXT PRIMARY KEY,
+    track_name TEXT,
+    artist TEXT,
+    duration_ms INTEGER,
+    type TEXT
+);
+
+CREATE TABLE IF NOT EXISTS daily_meta (
+    day TEXT PRIMARY KEY,
+    last_poll TEXT,
+    last_current_track_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS additions (
+    date TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    track_name TEXT,
+    artist TEXT,
+    source TEXT,
+    recorded_at TEXT,
+    PRIMARY KEY (date, track_id)
+);
+CREATE INDEX IF NOT EXISTS idx_additions_source ON additions (source, track_id);
+
+CREATE TABLE IF NOT EXISTS retries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    error_type TEXT,
+    error_message TEXT,
+    attempt INTEGER,
+    max_retries INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_retries_timestamp ON retries (timestamp);
+
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    playlist_id TEXT,
+    playlist_name TEXT,
+    last_checked TEXT,
+    track_count INTEGER,
+    extra TEXT
+);
+
+CREATE TABLE IF NOT EXISTS snapshot_tracks (
+    position INTEGER PRIMARY KEY,
+    track_id TEXT NOT NULL,
+    track_name TEXT,
+    artist TEXT,
+    added_at TEXT,
+    added_at_ms INTEGER,
+    duration_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_tracks_track ON snapshot_tracks (track_id);
+"""
+
+# track_name/artist/duration_ms/type are only set on plays recorded before
+# plays were normalized; newer plays get them from the tracks table
+PLAY_COLUMNS = (
+    "track_id", "track_name", "artist", "played_at", "played_at_ms",
+    "duration_ms", "type", "context_type", "source",
+)
+SNAPSHOT_TRACK_COLUMNS = (
+    "track_id", "track_name", "artist", "added_at", "added_at_ms", "duration_ms", "position",
+)
+# Columns added to existing tables after state.db was introduced:
+# (table, column, type), added by open_state_db if missing
+STATE_DB_ADDED_COLUMNS = (
+    ("plays", "played_at_ms", "INTEGER"),
+    ("snapshot_tracks", "added_at_ms", "INTEGER"),
+)
+SNAPSHOT_META_KEYS = ("playlist_id", "playlist_name", "last_checked", "track_count", "tracks")
+
+_state_db: Optional[sqlite3.Connection] = None
+_state_db_path: Optional[Path] = None
+
+
+def get_state_db_path() -> Path:
+    """Return path to the SQLite state store."""
+    return get_state_dir() / "state.db"
+
+
+def use_state_db() -> bool:
+    """True if this profile's state has been migrated to state.db."""
+    return get_state_db_path().exists()
+
+
+def open_state_db(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) a state database in WAL mode."""
+    conn = sqlite3.connect(str(path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(STATE_DB_SCHEMA)
+    for table, column, column_type in STATE_DB_ADDED_COLUMNS:
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    return conn
+
+
+def get_state_db() -> sqlite3.Connection:
+    """Return the (cached) connection to the current profile's state.db."""
+    global _state_db, _state_db_path
+    path = get_state_db_path()
+    if _state_db is None or _state_db_path != path:
+        _state_db = open_state_db(path)
+        _state_db_path = path
+    return _state_db
+
+
+def _db_insert_plays(conn: sqlite3.Connection, day: date, plays: List[Dict[str, Any]]) -> None:
+    conn.executemany(
+        f"INSERT OR IGNORE INTO plays (day, {', '.join(PLAY_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' for _ in PLAY_COLUMNS)})",
+        [(day.isoformat(), *(p.get(c) for c in PLAY_COLUMNS)) for p in plays],
+    )
+
+
+def _db_save_daily_meta(conn: sqlite3.Connection, day: date, log: Dict[str, Any]) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO daily_meta (day, last_poll, last_current_track_id) "
+        "VALUES (?, ?, ?)",
+        (day.isoformat(), log.get("last_poll"), log.get("last_current_track_id")),
+    )
+
+
+def _db_load_daily_log(day: date) -> Dict[str, Any]:
+    conn = get_state_db()
+    meta = conn.execute(
+        "SELECT last_poll, last_current_track_id FROM daily_meta WHERE day = ?",
+        (day.isoformat(),),
+    ).fetchone()
+    log = {
+        "date": day.isoformat(),
+        "last_poll": meta["last_poll"] if meta else None,
+        "last_current_track_id": meta["last_current_track_id"] if meta else None,
+        "plays": [],
+        "play_counts": {},
+        "last_seen": {},
+    }
+    rows = conn.execute(
+        f"SELECT {', '.join(PLAY_COLUMNS)} FROM plays WHERE day = ? ORDER BY rowid",
+        (day.isoformat(),),
+    )
+    for row in rows:
+        add_play(log, {k: v for k, v in dict(row).items() if v is not None})
+    return log
+
+
+def _db_collect_plays_by_day(days: List[date]) -> List[Tuple[str, int, Dict[str, Any]]]:
+    """(day, play count, latest play record) per track and day over `days` (one indexed query)."""
+    placeholders = ", ".join("?" for _ in days)
+    rows = get_state_db().execute(
+        f"SELECT {', '.join('p.' + c for c in PLAY_COLUMNS)}, p.day, c.play_count "
+        f"FROM plays p JOIN ("
+        f"  SELECT day, track_id, MAX(played_at) AS latest, COUNT(*) AS play_count FROM plays "
+        f"  WHERE day IN ({placeholders}) GROUP BY day, track_id"
+        f") c ON p.day = c.day AND p.track_id = c.track_id AND p.played_at = c.latest",
+        [d.isoformat() for d in days],
+    )
+    result = []
+    for row in rows:
+        play = dict(row)
+        result.append((play.pop("day"), play.pop("play_count"), play))
+    return result
+
+
+def _db_save_track_metadata(conn: sqlite3.Connection, tracks: Dict[str, Dict[str, Any]]) -> None:
+    conn.executemany(
+        f"INSERT OR REPLACE INTO tracks (track_id, {', '.join(TRACK_METADATA_FIELDS)}) "
+        f"VALUES (?, {', '.join('?' for _ in TRACK_METADATA_FIELDS)})",
+        [(tid, *(meta.get(f) for f in TRACK_METADATA_FIELDS)) for tid, meta in tracks.items()],
+    )
+
+
+def _db_load_snapshot() -> Optional[Dict[str, Any]]:
+    conn = get_state_db()
+    meta = conn.execute("SELECT * FROM snapshot WHERE id = 1").fetchone()
+    if meta is None:
+        return None
+    snapshot = json.loads(meta["extra"] or "{}")
+    snapshot.update({
+        "playlist_id": meta["playlist_id"],
+        "playlist_name": meta["playlist_name"],
+        "last_checked": meta["last_checked"],
+        "track_count": meta["track_count"],
+    })
+    rows = conn.execute(
+        f"SELECT {', '.join(SNAPSHOT_TRACK_COLUMNS)} FROM snapshot_tracks ORDER BY position"
+    )
+    snapshot["tracks"] = [dict(row) for row in rows]
+    return snapshot
+
+
+def _db_save_snapshot(conn: sqlite3.Connection, snapshot: Dict[str, Any]) -> None:
+    snapshot = _snapshot_for_storage(snapshot)
+    extra = {k: v for k, v in snapshot.items() if k not in SNAPSHOT_META_KEYS}
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot "
+            "(id, playlist_id, playlist_name, last_checked, track_count, extra) "
+            "VALUES (1, ?, ?, ?, ?, ?)",
+            (
+                snapshot.get("playlist_id"),
+                snapshot.get("playlist_name"),
+                snapshot.get("last_checked"),
+                snapshot.get("track_count"),
+                json.dumps(extra),
+            ),
+        )
+        conn.execute("DELETE FROM snapshot_tracks")
+        conn.executemany(
+            f"INSERT INTO snapshot_tracks ({', '.join(SNAPSHOT_TRACK_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in SNAPSHOT_TRACK_COLUMNS)})",
+            [tuple(t.get(c) for c in SNAPSHOT_TRACK_COLUMNS) for t in snapshot.get("tracks", [])],
+        )
+
+
+def migrate_state_to_db(verbose: bool = True) -> int:
+    """
+    One-time import of this profile's JSON state files into state.db.
+    
+    Builds the database under a temporary name and renames it into place at
+    the end, so an interrupted migration leaves the JSON backend in use. The
+    JSON files are left untouched (they are simply no longer read).
+    
+    Returns exit code: 0 for success, 1 if already migrated.
+    """
+    db_path = get_state_db_path()
+    if db_path.exists():
+        print(f"Already migrated: {db_path}", file=sys.stderr)
+        return 1
+    
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    for leftover in (tmp_path, Path(f"{tmp_path}-wal"), Path(f"{tmp_path}-shm")):
+        if leftover.exists():
+            leftover.unlink()
+    
+    conn = open_state_db(tmp_path)
+    
+    # Daily logs (compacted day files and any outstanding journals)
+    days = set()
+    for path in get_daily_dir().iterdir():
+        if path.suffix in (".json", ".jsonl"):
+            try:
+                days.add(date.fromisoformat(path.stem))
+            except ValueError:
+                continue
+    play_total = 0
+    track_metadata = dict(load_track_metadata(compact=False))
+    with conn:
+        for day in sorted(days):
+            log = load_daily_log(day)
+            plays = []
+            for play in log["plays"]:
+                fact, metadata = split_play(play)
+                if metadata and fact["track_id"] not in track_metadata:
+                    track_metadata[fact["track_id"]] = metadata
+                plays.append(fact)
+            _db_insert_plays(conn, day, plays)
+            _db_save_daily_meta(conn, day, log)
+            play_total += len(plays)
+        _db_save_track_metadata(conn, track_metadata)
+    
+    additions = load_additions_log()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO additions "
+            "(date, track_id, track_name, artist, source, recorded_at) "
+            "VALUES (:date, :track_id, :track_name, :artist, :source, :recorded_at)",
+            [{"recorded_at": None, **a} for a in additions],
+        )
+    
+    retries = load_retry_log()
+    with conn:
+        conn.executemany(
+            "INSERT INTO retries (timestamp, error_type, error_message, attempt, max_retries) "
+            "VALUES (:timestamp, :error_type, :error_message, :attempt, :max_retries)",
+            [
+                {"error_type": None, "error_message": None, "attempt": None,
+                 "max_retries": None, **r}
+                for r in retries
+            ],
+        )
+    
+    snapshot = load_playlist_snapshot()
+    if snapshot:
+        _db_save_snapshot(conn, snapshot)
+    
+    conn.close()
+    tmp_path.rename(db_path)
+    
+    if verbose:
+        print(f"✓ Migrated state to {db_path}")
+        print(f"  {len(days)} day(s), {play_total} plays, {len(track_metadata)} tracks")
+        print(f"  {len(additions)} additions, {len(retries)} retry events")
+        print(f"  Playlist snapshot: {'yes' if snapshot else 'none'}")
+        print("The JSON state files are no longer read and can be archived.")
+    return 0
+
+
 # =============================================================================
 # Additions Log (tracks user vs auto-added songs)
 # =============================================================================
 
+# With JSON state, additions are an append-only ledger sharded by year
+# (additions/YYYY.jsonl), so recording one or reading a date range touches only
+# the shards for those dates. IDs of auto-added tracks are also appended to
+# additions/auto-ids.jsonl, so they can be listed without reading every shard.
+
+_addition_keys: Dict[Path, set] = {}  # shard path -> {(date, track_id)} recorded in it
+_auto_added_ids: Optional[set] = None
+_auto_added_ids_path: Optional[Path] = None
+
+
 def get_additions_log_path() -> Path:
-    """Return path to the additions log file."""
+    """Return path to the legacy single-file additions log (see _convert_additions_log)."""
     return get_state_dir() / "additions.json"
 
 
+def get_additions_dir() -> Path:
+    """Return path to the directory of yearly additions ledgers."""
+    additions_dir = get_state_dir() / "additions"
+    additions_dir.mkdir(parents=True, exist_ok=True)
+    return additions_dir
+
+
+def get_additions_shard_path(year: int) -> Path:
+    """Return path to the additions ledger for a year."""
+    return get_additions_dir() / f"{year:04d}.jsonl"
+
+
+def get_auto_added_ids_path() -> Path:
+    """Return path to the index of auto-added track IDs."""
+    return get_additions_dir() / "auto-ids.jsonl"
+
+
+def _read_legacy_additions_log() -> List[Dict[str, Any]]:
+    """Entries of a not-yet-converted additions.json, or [] if there is none."""
+    legacy_path = get_additions_log_path()
+    if not legacy_path.exists():
+        return []
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _convert_additions_log() -> None:
+    """
+    One-time split of a legacy additions.json into the yearly ledgers.
+    
+    Each shard is rewritten whole (existing entries plus the legacy ones it
+    doesn't already have) and renamed into place before the legacy file is
+    removed, so a conversion interrupted at any point can simply run again.
+    """
+    global _auto_added_ids
+    legacy_path = get_additions_log_path()
+    if not legacy_path.exists():
+        return
+    entries = _read_legacy_additions_log()
+    by_year: Dict[int, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        by_year.setdefault(int(entry["date"][:4]), []).append(entry)
+    for year, year_entries in sorted(by_year.items()):
+        shard_path = get_additions_shard_path(year)
+        merged = read_jsonl(shard_path)
+        keys = {(e["date"], e["track_id"]) for e in merged}
+        for entry in year_entries:
+            if (entry["date"], entry["track_id"]) not in keys:
+                merged.append(entry)
+                keys.add((entry["date"], entry["track_id"]))
+        write_jsonl_atomic(shard_path, merged)
+    auto_ids_path = get_auto_added_ids_path()
+    auto_ids = dict.fromkeys(record["track_id"] for record in read_jsonl(auto_ids_path))
+    auto_ids.update(dict.fromkeys(e["track_id"] for e in entries if e.get("source") == "auto"))
+    write_jsonl_atomic(auto_ids_path, ({"track_id": tid} for tid in auto_ids))
+    legacy_path.unlink()
+    _addition_keys.clear()
+    _auto_added_ids = None
+
+
+def _read_additions_shards(start_year: int, end_year: int) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    for year in range(start_year, end_year + 1):
+        entries.extend(read_jsonl(get_additions_shard_path(year)))
+    return entries
+
+
 def load_additions_log() -> List[Dict[str, Any]]:
-    """Load the additions log, or empty list if not exists."""
-    log_path = get_additions_log_path()
-    if log_path.exists():
-        with open(log_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    """
+    Load the whole additions log, oldest first, or empty list if none.
+    
+    A legacy additions.json is read as-is rather than converted, so this is
+    safe to call from migrate_state_to_db.
+    """
+    if use_state_db():
+        rows = get_state_db().execute(
+            "SELECT date, track_id, track_name, artist, source, recorded_at "
+            "FROM additions ORDER BY rowid"
+        )
+        return [dict(row) for row in rows]
+    entries = _read_legacy_additions_log()
+    keys = {(e["date"], e["track_id"]) for e in entries}
+    years = sorted(
+        int(path.stem) for path in get_additions_dir().glob("*.jsonl") if path.stem.isdigit()
+    )
+    if years:
+        entries.extend(
+            e for e in _read_additions_shards(years[0], years[-1])
+            if (e["date"], e["track_id"]) not in keys
+        )
+    return entries
+
 
+RETRY_LOG_MONTHS = 3  # monthly retry journals kept (the weekly summary needs 7 days)
+RETRY_DB_MAX_EVENTS = 5000  # retry rows kept in state.db
 
-def save_additions_log(log: List[Dict[str, Any]]) -> None:
-    """Save the additions log."""
-    log_path = get_additions_log_path()
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(log, f, indent=2)
+# Retry events recorded this run, written by flush_retry_log (at the end of
+# each command and --daemon cycle, under the state lock) instead of one file
+# rewrite per retry
+_pending_retries: List[Dict[str, Any]] = []
 
 
 def get_retry_log_path() -> Path:
-    """Return path to the retry log file."""
+    """Return path to the legacy single-file retry log (see flush_retry_log)."""
     return get_state_dir() / "retry-log.json"
 
 
-def load_retry_log() -> List[Dict[str, Any]]:
-    """Load the retry log, or empty list if not exists."""
-    log_path = get_retry_log_path()
-    if log_path.exists():
-        with open(log_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+def get_retry_log_dir() -> Path:
+    """Return path to the directory of monthly retry journals (YYYY-MM.jsonl)."""
+    return get_state_dir() / "retries"
+
+
+def _months_between(start_date: date, end_date: date) -> List[str]:
+    """"YYYY-MM" for each month from start_date's through end_date's."""
+    months = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
 
 
-def save_retry_log(log: List[Dict[str, Any]]) -> None:
-    """Save the retry log."""
-    log_path = get_retry_log_path()
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(log, f, indent=2)
+def load_retry_log(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """
+    Load retry events, oldest first.
+    
+    With start_date/end_date, only the monthly journals covering that range
+    are read (events outside it may still be included; filter by timestamp).
+    """
+    if use_state_db():
+        rows = get_state_db().execute(
+            "SELECT timestamp, error_type, error_message, attempt, max_retries "
+            "FROM retries ORDER BY id"
+        )
+        return [dict(row) for row in rows]
+    
+    log: List[Dict[str, Any]] = []
+    legacy_path = get_retry_log_path()
+    if legacy_path.exists():
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            log.extend(json.load(f))
+    
+    log_dir = get_retry_log_dir()
+    if start_date is not None and end_date is not None:
+        paths = [log_dir / f"{month}.jsonl" for month in _months_between(start_date, end_date)]
+    else:
+        paths = sorted(log_dir.glob("*.jsonl")) if log_dir.exists() else []
+    # A partly split legacy file may overlap the journals (see _convert_retry_log)
+    legacy_keys = {_retry_event_key(e) for e in log}
+    for path in paths:
+        log.extend(e for e in read_jsonl(path) if _retry_event_key(e) not in legacy_keys)
+    return log
+
+
+def _retry_event_key(event: Dict[str, Any]) -> tuple:
+    return (event.get("timestamp"), event.get("error_type"), event.get("attempt"))
+
+
+def _convert_retry_log() -> None:
+    """
+    One-time split of a legacy retry-log.json into the monthly journals.
+    
+    Each journal is rewritten whole (existing events plus the legacy ones it
+    doesn't already have) and renamed into place before the legacy file is
+    removed, so a split interrupted at any point can simply run again.
+    """
+    legacy_path = get_retry_log_path()
+    if not legacy_path.exists():
+        return
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        events = json.load(f)
+    log_dir = get_retry_log_dir()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    by_month: Dict[str, List[Dict[str, Any]]] = {}
+    for event in events:
+        by_month.setdefault(event.get("timestamp", "")[:7], []).append(event)
+    for month, month_events in sorted(by_month.items()):
+        if not month:
+            continue
+        path = log_dir / f"{month}.jsonl"
+        merged = read_jsonl(path)
+        keys = {_retry_event_key(e) for e in merged}
+        merged.extend(e for e in month_events if _retry_event_key(e) not in keys)
+        write_jsonl_atomic(path, sorted(merged, key=lambda e: e.get("timestamp", "")))
+    legacy_path.unlink()
+
+
+def flush_retry_log() -> None:
+    """
+    Write the retry events recorded since the last flush. Call it while
+    holding the state lock (see flush_retry_log_at_exit for stragglers).
+    
+    JSON state: events are appended to the journal for their month and
+    only the newest RETRY_LOG_MONTHS journals are kept. A legacy retry-log.json
+    is split into the monthly journals first (see _convert_retry_log).
+    state.db: events are inserted in one batch, keeping the newest
+    RETRY_DB_MAX_EVENTS.
+    """
+    if use_state_db():
+        if not _pending_retries:
+            return
+        conn = get_state_db()
+        with conn:
+            conn.executemany(
+                "INSERT INTO retries (timestamp, error_type, error_message, attempt, max_retries) "
+                "VALUES (:timestamp, :error_type, :error_message, :attempt, :max_retries)",
+                _pending_retries,
+            )
+            conn.execute(
+                "DELETE FROM retries WHERE id <= (SELECT MAX(id) FROM retries) - ?",
+                (RETRY_DB_MAX_EVENTS,),
+            )
+        _pending_retries.clear()
+        return
+    
+    _convert_retry_log()
+    log_dir = get_retry_log_dir()
+    if _pending_retries:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for event in _pending_retries:
+            by_month.setdefault(event.get("timestamp", "")[:7], []).append(event)
+        for month, month_events in by_month.items():
+            if month:
+                append_jsonl(log_dir / f"{month}.jsonl", month_events)
+        _pending_retries.clear()
+    
+    # Rotate: keep the newest RETRY_LOG_MONTHS monthly journals
+    journals = sorted(log_dir.glob("*.jsonl"))
+    for path in journals[:-RETRY_LOG_MONTHS]:
+        path.unlink()
+
+
+def flush_retry_log_at_exit() -> None:
+    """
+    Fallback for retry events still buffered at exit (registered in main).
+    
+    Commands flush while holding the state lock; events recorded outside it
+    (e.g. while authenticating for a poll that was then skipped) are written
+    only if the lock is free, and otherwise dropped rather than written while
+    another run is rotating the journals.
+    """
+    if not _pending_retries:
+        return
+    with state_lock(get_state_lock_path(), blocking=False) as locked:
+        if locked:
+            flush_retry_log()
 
 
 def record_retry(error: Exception, attempt: int, max_retries: int) -> None:
-    """Record a retry event to the log."""
-    log = load_retry_log()
-    log.append({
+    """Record a retry event (buffered until flush_retry_log)."""
+    _pending_retries.append({
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "error_type": type(error).__name__,
         "error_message": str(error)[:200],  # Truncate long messages
         "attempt": attempt + 1,
         "max_retries": max_retries,
     })
-    # Keep only last 30 days of entries (cap at ~5000 entries)
-    if len(log) > 5000:
-        log = log[-5000:]
-    save_retry_log(log)
 
 
 def get_retry_stats_for_period(start_date: date, end_date: date) -> Dict[str, Any]:
@@ -877,7 +1494,32 @@ def get_retry_stats_for_period(start_date: date, end_date: date) -> Dict[str, An
     
     Returns dict with: total_retries, days_with_retries, by_error_type, by_date
     """
-    log = load_retry_log()
+    flush_retry_log()  # include this run's retries
+    
+    if use_state_db():
+        # Timestamps are ISO 8601 strings, so a date range is a string range
+        rows = get_state_db().execute(
+            "SELECT substr(timestamp, 1, 10) AS day, error_type, COUNT(*) AS n "
+            "FROM retries WHERE timestamp >= ? AND timestamp < ? "
+            "GROUP BY day, error_type",
+            (start_date.isoformat(), (end_date + timedelta(days=1)).isoformat()),
+        ).fetchall()
+        if not rows:
+            return {"total_retries": 0}
+        by_type: Dict[str, int] = {}
+        by_date: Dict[str, int] = {}
+        for row in rows:
+            err_type = row["error_type"] or "Unknown"
+            by_type[err_type] = by_type.get(err_type, 0) + row["n"]
+            by_date[row["day"]] = by_date.get(row["day"], 0) + row["n"]
+        return {
+            "total_retries": sum(by_type.values()),
+            "days_with_retries": len(by_date),
+            "by_error_type": by_type,
+            "by_date": by_date,
+        }
+    
+    log = load_retry_log(start_date, end_date)
     
     start_str = start_date.isoformat()
     end_str = end_date.isoformat()
@@ -916,38 +1558,252 @@ def record_addition(
     source: str,  # "user" or "auto"
     date_added: date
 ) -> None:
-    """Record a song addition to the log."""
-    log = load_additions_log()
-    
-    # Avoid duplicates for the same date
-    existing = next(
-        (e for e in log if e["date"] == date_added.isoformat() and e["track_id"] == track_id),
-        None
-    )
-    if existing:
-        return  # Already recorded
-    
-    log.append({
+    """Record a song addition to the log (once per date and track)."""
+    entry = {
         "date": date_added.isoformat(),
         "track_id": track_id,
         "track_name": track_name,
         "artist": artist,
         "source": source,
         "recorded_at": datetime.now(pytz.UTC).isoformat(),
-    })
+    }
+    
+    if use_state_db():
+        # (date, track_id) is the primary key, so duplicates are ignored
+        conn = get_state_db()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO additions "
+                "(date, track_id, track_name, artist, source, recorded_at) "
+                "VALUES (:date, :track_id, :track_name, :artist, :source, :recorded_at)",
+                entry,
+            )
+        return
     
-    save_additions_log(log)
+    _convert_additions_log()
+    shard_path = get_additions_shard_path(date_added.year)
+    keys = _addition_keys.get(shard_path)
+    if keys is None:
+        keys = {(e["date"], e["track_id"]) for e in read_jsonl(shard_path)}
+        _addition_keys[shard_path] = keys
+    
+    # Avoid duplicates for the same date
+    if (entry["date"], track_id) in keys:
+        return  # Already recorded
+    
+    append_jsonl(shard_path, [entry])
+    keys.add((entry["date"], track_id))
+    
+    if source == "auto":
+        auto_ids = get_auto_added_ids()
+        if track_id not in auto_ids:
+            append_jsonl(get_auto_added_ids_path(), [{"track_id": track_id}])
+            auto_ids.add(track_id)
 
 
 def get_additions_for_period(start_date: date, end_date: date) -> List[Dict[str, Any]]:
     """Get all additions within a date range (inclusive)."""
-    log = load_additions_log()
+    if use_state_db():
+        rows = get_state_db().execute(
+            "SELECT date, track_id, track_name, artist, source, recorded_at "
+            "FROM additions WHERE date BETWEEN ? AND ? ORDER BY rowid",
+            (start_date.isoformat(), end_date.isoformat()),
+        )
+        return [dict(row) for row in rows]
+    _convert_additions_log()
+    # ISO dates compare correctly as strings
+    start_str, end_str = start_date.isoformat(), end_date.isoformat()
     return [
-        e for e in log
-        if start_date <= date.fromisoformat(e["date"]) <= end_date
+        e for e in _read_additions_shards(start_date.year, end_date.year)
+        if start_str <= e["date"] <= end_str
     ]
 
 
+def get_auto_added_ids() -> set:
+    """Return the IDs of all tracks ever auto-added (for 🤖/👤 icons)."""
+    if use_state_db():
+        rows = get_state_db().execute(
+            "SELECT DISTINCT track_id FROM additions WHERE source = 'auto'"
+        )
+        return {row["track_id"] for row in rows}
+    global _auto_added_ids, _auto_added_ids_path
+    _convert_additions_log()
+    path = get_auto_added_ids_path()
+    if _auto_added_ids is None or _auto_added_ids_path != path:
+        _auto_added_ids = {record["track_id"] for record in read_jsonl(path)}
+        _auto_added_ids_path = path
+    return _auto_added_ids
+
+
+# =============================================================================
+# Track Metadata
+# =============================================================================
+#
+# Plays are stored as facts (track_id, played_at, and how the play was
+# captured). Each track's name, artist, duration and type is stored once per
+# profile, in tracks.jsonl (or the tracks table of state.db), and joined back in
+# with join_play wherever plays are reported.
+
+TRACK_METADATA_FIELDS = ("track_name", "artist", "duration_ms", "type")
+TRACK_METADATA_DEFAULTS = {"track_name": "Unknown", "artist": "Unknown", "duration_ms": 0, "type": "track"}
+
+_track_metadata: Optional[Dict[str, Dict[str, Any]]] = None
+_track_metadata_path: Optional[Path] = None
+_track_metadata_version: Optional[tuple] = None
+
+
+def get_track_metadata_path() -> Path:
+    """
+    Return path to the track metadata journal.
+    
+    Append-only JSON Lines, one {"track_id", ...metadata} record per new or
+    changed track; the last record for a track wins (superseded records are
+    dropped by load_track_metadata).
+    """
+    return get_state_dir() / "tracks.jsonl"
+
+
+def _get_track_metadata_version(path: Path) -> tuple:
+    """
+    Identify the stored metadata's current contents, so a cached copy can tell
+    another process (or a --daemon's earlier cycle) has since written to it.
+    """
+    if use_state_db():
+        # Changes whenever another connection commits
+        return ("db", get_state_db().execute("PRAGMA data_version").fetchone()[0])
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return ("jsonl", None)
+    return ("jsonl", stat.st_size, stat.st_mtime_ns)
+
+
+def load_track_metadata(compact: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the profile's track metadata: track_id -> track_name, artist,
+    duration_ms, type. Cached, and reloaded when the store has changed since.
+    
+    tracks.jsonl is compacted (one record per track) when it's reloaded with
+    superseded records in it, unless compact is False (migrate_state_to_db,
+    which leaves the JSON files untouched).
+    """
+    global _track_metadata, _track_metadata_path, _track_metadata_version
+    path = get_state_db_path() if use_state_db() else get_track_metadata_path()
+    version = _get_track_metadata_version(path)
+    if _track_metadata is None or _track_metadata_path != path or _track_metadata_version != version:
+        tracks: Dict[str, Dict[str, Any]] = {}
+        if use_state_db():
+            for row in get_state_db().execute("SELECT * FROM tracks"):
+                row = dict(row)
+                tracks[row.pop("track_id")] = row
+        else:
+            records = read_jsonl(path)
+            for record in records:
+                record = dict(record)
+                tracks[record.pop("track_id")] = record
+            if compact and len(records) > len(tracks):
+                write_jsonl_atomic(path, ({"track_id": tid, **meta} for tid, meta in tracks.items()))
+                version = _get_track_metadata_version(path)
+        _track_metadata, _track_metadata_path, _track_metadata_version = tracks, path, version
+    return _track_metadata
+
+
+def record_track_metadata(tracks: Dict[str, Dict[str, Any]]) -> None:
+    """Store metadata for tracks (track_id -> metadata); unchanged tracks aren't rewritten."""
+    global _track_metadata_version
+    known = load_track_metadata()
+    changed = {tid: meta for tid, meta in tracks.items() if known.get(tid) != meta}
+    if not changed:
+        return
+    if use_state_db():
+        conn = get_state_db()
+        with conn:
+            _db_save_track_metadata(conn, changed)
+    else:
+        path = get_track_metadata_path()
+        append_jsonl(path, ({"track_id": tid, **meta} for tid, meta in changed.items()))
+        _track_metadata_version = _get_track_metadata_version(path)
+    known.update(changed)
+
+
+def track_metadata(track: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata fields of a Spotify track object."""
+    return {
+        "track_name": track.get("name", "Unknown"),
+        "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
+        "duration_ms": track.get("duration_ms", 0),
+        "type": track.get("type", "track"),
+    }
+
+
+def split_play(play: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Split a play record into (fact, metadata).
+    
+    metadata is empty unless the record carries its track's metadata inline
+    (as plays recorded before normalization do).
+    """
+    fact = {k: v for k, v in play.items() if k not in TRACK_METADATA_FIELDS}
+    if not any(play.get(f) is not None for f in TRACK_METADATA_FIELDS):
+        return fact, {}
+    metadata = {f: play.get(f, TRACK_METADATA_DEFAULTS[f]) for f in TRACK_METADATA_FIELDS}
+    return fact, metadata
+
+
+def join_play(
+    play: Dict[str, Any], tracks: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Any]:
+    """
+    Return the play with its track's metadata filled in.
+    
+    tracks: the metadata table (default: load_track_metadata()); metadata a
+            legacy play carries inline is used for tracks missing from it
+    """
+    if tracks is None:
+        tracks = load_track_metadata()
+    joined = dict(TRACK_METADATA_DEFAULTS)
+    joined.update((k, v) for k, v in play.items() if v is not None)
+    joined.update(tracks.get(play["track_id"], {}))
+    return joined
+
+
+def get_log_track_metadata(log: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    The metadata table, plus inline metadata of any legacy plays in `log` whose
+    tracks it lacks (one pass over the plays).
+    """
+    tracks = load_track_metadata()
+    legacy: Dict[str, Dict[str, Any]] = {}
+    for play in log["plays"]:
+        if play["track_id"] not in tracks and play["track_id"] not in legacy:
+            metadata = split_play(play)[1]
+            if metadata:
+                legacy[play["track_id"]] = metadata
+    return {**tracks, **legacy} if legacy else tracks
+
+
+def format_track(tracks: Dict[str, Dict[str, Any]], track_id: str) -> str:
+    """"Name — Artist" for a track, looked up in `tracks` (see get_log_track_metadata)."""
+    meta = tracks.get(track_id)
+    if meta is None:
+        return track_id
+    return f"{meta.get('track_name', track_id)} — {meta.get('artist', '')}"
+
+
+def _normalize_plays(plays: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Plays as facts, moving inline metadata of legacy plays into the table."""
+    known = load_track_metadata()
+    facts = []
+    legacy: Dict[str, Dict[str, Any]] = {}
+    for play in plays:
+        fact, metadata = split_play(play)
+        if metadata and fact["track_id"] not in known:
+            legacy[fact["track_id"]] = metadata
+        facts.append(fact)
+    record_track_metadata(legacy)
+    return facts
+
+
 # =============================================================================
 # Daily Listening Log
 # =============================================================================
@@ -960,32 +1816,293 @@ def get_daily_dir() -> Path:
 
 
 def get_daily_log_path(day: date) -> Path:
-    """Return path to the daily log file for a given date."""
+    """Return path to the (compacted) daily log file for a given date."""
     return get_daily_dir() / f"{day.isoformat()}.json"
 
 
+def get_daily_journal_path(day: date) -> Path:
+    """
+    Return path to the append-only play journal for a given date.
+    
+    Each poll appends its new plays (and a "meta" record with last_poll state)
+    here instead of rewriting the whole day file. The journal is folded into
+    YYYY-MM-DD.json at day rollover (see compact_daily_journals).
+    """
+    return get_daily_dir() / f"{day.isoformat()}.jsonl"
+
+
+def add_play(log: Dict[str, Any], play: Dict[str, Any]) -> None:
+    """
+    Append a play to an in-memory daily log, keeping play_counts and
+    last_seen (track_id -> latest played_at in epoch ms) current.
+    """
+    log["plays"].append(play)
+    tid = play["track_id"]
+    log["play_counts"][tid] = log["play_counts"].get(tid, 0) + 1
+    _update_last_seen(log["last_seen"], play)
+
+
+def _update_last_seen(last_seen: Dict[str, int], play: Dict[str, Any]) -> None:
+    try:
+        played_at_ms = record_time_ms(play, "played_at")
+    except ValueError:
+        return
+    # max(), not overwrite: plays don't always arrive in played_at order
+    if played_at_ms is not None and played_at_ms > last_seen.get(play["track_id"], -1):
+        last_seen[play["track_id"]] = played_at_ms
+
+
 def load_daily_log(day: date) -> Dict[str, Any]:
-    """Load the daily log for a given date, or create empty structure."""
+    """
+    Load the daily log for a given date, or create empty structure.
+    
+    Merges the compacted day file (if any) with the day's journal (if any).
+    Journal plays already in the day file are skipped, so a journal left
+    behind by a compaction that crashed before removing it isn't counted twice.
+    """
+    if use_state_db():
+        return _db_load_daily_log(day)
+    
     log_path = get_daily_log_path(day)
     
     if log_path.exists():
         with open(log_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+            log = json.load(f)
+        log.setdefault("play_counts", {})
+        if "last_seen" not in log:
+            # Day file from before last_seen was kept
+            log["last_seen"] = {}
+            for play in log["plays"]:
+                _update_last_seen(log["last_seen"], play)
+    else:
+        log = {
+            "date": day.isoformat(),
+            "last_poll": None,
+            "last_current_track_id": None,  # For currently-playing dedup
+            "plays": [],
+            "play_counts": {},
+            "last_seen": {},  # For recently-played dedup (see has_recent_play)
+        }
     
-    return {
-        "date": day.isoformat(),
-        "last_poll": None,
-        "last_current_track_id": None,  # For currently-playing dedup
-        "plays": [],
-        "play_counts": {},
-    }
+    recorded = {(p["played_at"], p["track_id"]) for p in log["plays"]}
+    for record in read_jsonl(get_daily_journal_path(day)):
+        if "play" in record:
+            play = record["play"]
+            if (play["played_at"], play["track_id"]) in recorded:
+                continue
+            add_play(log, play)
+            recorded.add((play["played_at"], play["track_id"]))
+        elif "meta" in record:
+            log.update(record["meta"])
+    
+    return log
+
+
+def append_daily_log(day: date, log: Dict[str, Any], new_plays: List[Dict[str, Any]]) -> None:
+    """
+    Append a poll's new plays and current poll state to the day's journal.
+    
+    `log` must already contain new_plays (see add_play); only the delta is written.
+    """
+    if use_state_db():
+        conn = get_state_db()
+        with conn:
+            _db_insert_plays(conn, day, new_plays)
+            _db_save_daily_meta(conn, day, log)
+        return
+    
+    records: List[Dict[str, Any]] = [{"play": play} for play in new_plays]
+    records.append({
+        "meta": {
+            "last_poll": log.get("last_poll"),
+            "last_current_track_id": log.get("last_current_track_id"),
+        }
+    })
+    append_jsonl(get_daily_journal_path(day), records)
 
 
 def save_daily_log(day: date, log: Dict[str, Any]) -> None:
-    """Save the daily log for a given date."""
+    """
+    Save the full daily log for a given date (used when compacting).
+    
+    Legacy plays with inline track metadata are written as facts, their
+    metadata moving to the track metadata table.
+    """
+    plays = _normalize_plays(log["plays"])
+    if use_state_db():
+        conn = get_state_db()
+        with conn:
+            conn.execute("DELETE FROM plays WHERE day = ?", (day.isoformat(),))
+            _db_insert_plays(conn, day, plays)
+            _db_save_daily_meta(conn, day, log)
+        return
+    
     log_path = get_daily_log_path(day)
-    with open(log_path, "w", encoding="utf-8") as f:
-        json.dump(log, f, indent=2)
+    write_json_atomic(log_path, {**log, "plays": plays})
+
+
+def get_daily_log_version(day: date) -> Optional[int]:
+    """
+    Return a value that changes whenever another process writes the day's log.
+    
+    Used by --daemon to decide whether its in-memory log is still current.
+    """
+    if use_state_db():
+        # data_version only changes for commits made by *other* connections
+        return get_state_db().execute("PRAGMA data_version").fetchone()[0]
+    try:
+        return get_daily_journal_path(day).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def compact_daily_journals(before: date) -> None:
+    """
+    Fold the journals of all days before `before` into their day files.
+    
+    Called on the first poll of a new day, so at most one journal (today's)
+    is normally outstanding.
+    """
+    for journal_path in sorted(get_daily_dir().glob("*.jsonl")):
+        try:
+            day = date.fromisoformat(journal_path.stem)
+        except ValueError:
+            continue
+        if day >= before:
+            continue
+        save_daily_log(day, load_daily_log(day))
+        journal_path.unlink()
+
+
+# =============================================================================
+# Play Aggregates
+# =============================================================================
+#
+# play-aggregates.json keeps per-track play counts over the windows selection
+# uses, updated by each poll, so finalize doesn't have to re-read a week of
+# daily logs:
+#
+#   {"as_of": "YYYY-MM-DD",
+#    "day_totals": {"YYYY-MM-DD": plays that day, ...},
+#    "tracks": {track_id: {"daily": {"YYYY-MM-DD": n, ...},
+#                          "windows": {"1": n, "2": n, "3": n, "7": n, "30": n},
+#                          "last_played": played_at,
+#                          "track_name", "artist", "duration_ms", "type"}}}
+#
+# Windows count back from as_of (today); the file rolls forward on the first
+# load of a new day. It's derived data: if missing it is rebuilt from the logs.
+
+AGGREGATE_WINDOWS = (1, 2, 3, 7, 30)  # days
+AGGREGATE_DAYS = max(AGGREGATE_WINDOWS)
+
+
+def get_play_aggregates_path() -> Path:
+    """Return path to the rolling play-count aggregates file."""
+    return get_state_dir() / "play-aggregates.json"
+
+
+def _aggregate_windows(daily: Dict[str, int], today: date) -> Dict[str, int]:
+    """Sum a track's per-day counts into each of AGGREGATE_WINDOWS ending today."""
+    windows = {str(w): 0 for w in AGGREGATE_WINDOWS}
+    for day_str, count in daily.items():
+        age = (today - date.fromisoformat(day_str)).days
+        for w in AGGREGATE_WINDOWS:
+            if 0 <= age < w:
+                windows[str(w)] += count
+    return windows
+
+
+def _add_play_to_aggregates(aggregates: Dict[str, Any], day: date, play: Dict[str, Any], count: int = 1) -> None:
+    """Count `count` plays of play's track on `day` (a day inside the windows)."""
+    day_str = day.isoformat()
+    age = (date.fromisoformat(aggregates["as_of"]) - day).days
+    entry = aggregates["tracks"].setdefault(play["track_id"], {"daily": {}, "windows": {}})
+    entry["daily"][day_str] = entry["daily"].get(day_str, 0) + count
+    for w in AGGREGATE_WINDOWS:
+        if 0 <= age < w:
+            entry["windows"][str(w)] = entry["windows"].get(str(w), 0) + count
+    if play.get("played_at", "") >= entry.get("last_played", ""):
+        entry["last_played"] = play.get("played_at", "")
+        # Plays recorded before normalization carry their metadata inline;
+        # keep it for build_play_index in case the metadata table lacks it
+        entry.update(split_play(play)[1])
+    aggregates["day_totals"][day_str] = aggregates["day_totals"].get(day_str, 0) + count
+
+
+def roll_play_aggregates(aggregates: Dict[str, Any], today: date) -> None:
+    """Move the windows forward to `today`, dropping days older than AGGREGATE_DAYS."""
+    if aggregates.get("as_of") == today.isoformat():
+        return
+    oldest = (today - timedelta(days=AGGREGATE_DAYS - 1)).isoformat()
+    for track_id in list(aggregates["tracks"]):
+        entry = aggregates["tracks"][track_id]
+        entry["daily"] = {d: n for d, n in entry["daily"].items() if d >= oldest}
+        if not entry["daily"]:
+            del aggregates["tracks"][track_id]
+            continue
+        entry["windows"] = _aggregate_windows(entry["daily"], today)
+    aggregates["day_totals"] = {d: n for d, n in aggregates["day_totals"].items() if d >= oldest}
+    aggregates["as_of"] = today.isoformat()
+
+
+def rebuild_play_aggregates(today: date) -> Dict[str, Any]:
+    """Recompute the aggregates from the last AGGREGATE_DAYS daily logs and save them."""
+    aggregates: Dict[str, Any] = {"as_of": today.isoformat(), "day_totals": {}, "tracks": {}}
+    days = [today - timedelta(days=i) for i in range(AGGREGATE_DAYS)]
+    if use_state_db():
+        for day_str, count, play in _db_collect_plays_by_day(days):
+            _add_play_to_aggregates(aggregates, date.fromisoformat(day_str), play, count)
+    else:
+        for day in days:
+            for play in load_daily_log(day).get("plays", []):
+                _add_play_to_aggregates(aggregates, day, play)
+    save_play_aggregates(aggregates)
+    return aggregates
+
+
+def load_play_aggregates(today: date) -> Dict[str, Any]:
+    """Load the aggregates rolled forward to `today` (rebuilding them if missing)."""
+    path = get_play_aggregates_path()
+    if not path.exists():
+        return rebuild_play_aggregates(today)
+    with open(path, "r", encoding="utf-8") as f:
+        aggregates = json.load(f)
+    roll_play_aggregates(aggregates, today)
+    return aggregates
+
+
+def save_play_aggregates(aggregates: Dict[str, Any]) -> None:
+    """Save the aggregates (machine-only, so compact)."""
+    write_json_atomic(get_play_aggregates_path(), aggregates, compact=True)
+
+
+def update_play_aggregates(today: date, log: Dict[str, Any], plays_before: int) -> None:
+    """
+    Count a poll's new plays (log["plays"][plays_before:]) into the aggregates.
+    
+    If the aggregates don't already account for exactly the first plays_before
+    plays of today (e.g. a previous poll died between writing the log and the
+    aggregates), today's counts are recomputed from the log instead.
+    """
+    aggregates = load_play_aggregates(today)
+    today_str = today.isoformat()
+    new_plays = log["plays"][plays_before:]
+    
+    if aggregates["day_totals"].get(today_str, 0) != plays_before:
+        for track_id in list(aggregates["tracks"]):
+            entry = aggregates["tracks"][track_id]
+            if entry["daily"].pop(today_str, None) is None:
+                continue
+            if not entry["daily"]:
+                del aggregates["tracks"][track_id]
+            else:
+                entry["windows"] = _aggregate_windows(entry["daily"], today)
+        aggregates["day_totals"].pop(today_str, None)
+        new_plays = log["plays"]
+    
+    for play in new_plays:
+        _add_play_to_aggregates(aggregates, today, play)
+    save_play_aggregates(aggregates)
 
 
 # =============================================================================
@@ -1002,44 +2119,91 @@ def parse_played_at(played_at_str: str) -> datetime:
         return datetime.strptime(played_at_str, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.UTC)
 
 
-def get_today(tz: pytz.BaseTzInfo) -> date:
-    """Get today's date in the specified timezone."""
-    return datetime.now(tz).date()
+def timestamp_ms(timestamp: str) -> int:
+    """
+    Convert a Spotify timestamp (ISO 8601 UTC) to epoch milliseconds.
+    
+    Spotify's two formats ("2024-01-15T14:32:00.123Z", "2024-01-15T14:32:00Z")
+    are sliced directly, which is much cheaper than strptime; anything else
+    goes through parse_played_at / datetime.fromisoformat.
+    """
+    if len(timestamp) in (20, 24) and timestamp[-1] == "Z" and timestamp[10] == "T":
+        seconds = calendar.timegm((
+            int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+            int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19]),
+        ))
+        return seconds * 1000 + (int(timestamp[20:23]) if len(timestamp) == 24 else 0)
+    if timestamp.endswith("Z"):
+        dt = parse_played_at(timestamp)
+    else:
+        dt = datetime.fromisoformat(timestamp)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=pytz.UTC)
+    return calendar.timegm(dt.utctimetuple()) * 1000 + dt.microsecond // 1000
+
+
+def record_time_ms(record: Dict[str, Any], key: str) -> Optional[int]:
+    """
+    Epoch milliseconds of a record's timestamp field (e.g. "played_at").
+    
+    Plays and snapshot tracks store the value as record[key + "_ms"] when
+    written; records from before that are parsed with timestamp_ms.
+    
+    Returns None if the record has no timestamp. Raises ValueError if it
+    can't be parsed.
+    """
+    ms = record.get(f"{key}_ms")
+    if ms is None:
+        value = record.get(key)
+        if not value:
+            return None
+        ms = timestamp_ms(value)
+    return ms
+
 
+def day_bounds_ms(day: date, tz: pytz.BaseTzInfo) -> Tuple[int, int]:
+    """Epoch milliseconds of local midnight starting `day` and the next day in tz."""
+    start = tz.localize(datetime.combine(day, datetime.min.time()))
+    end = tz.localize(datetime.combine(day + timedelta(days=1), datetime.min.time()))
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
 
-def has_recent_play(log: Dict[str, Any], track_id: str, within_seconds: int = 300) -> bool:
+
+def has_recent_play(
+    log: Dict[str, Any], track_id: str, now_ms: int, within_seconds: int = 300
+) -> bool:
     """
-    Check if we've recorded a play of this track within the last N seconds.
+    Check if we've recorded a play of this track within N seconds before now_ms
+    (epoch milliseconds, the run's clock).
     Used to avoid double-counting from both recently-played and currently-playing.
+    
+    Looks up the track's latest play in log["last_seen"] (kept by add_play),
+    so it doesn't depend on the order plays were recorded in.
     """
-    if not log["plays"]:
+    last_seen_ms = log.get("last_seen", {}).get(track_id)
+    if last_seen_ms is None:
         return False
-    
-    now_utc = datetime.now(pytz.UTC)
-    for play in reversed(log["plays"]):  # Check most recent first
-        try:
-            play_time = parse_played_at(play["played_at"])
-            age_seconds = (now_utc - play_time).total_seconds()
-            if age_seconds > within_seconds:
-                break  # Plays are roughly chronological, no need to check older
-            if play["track_id"] == track_id:
-                return True
-        except (ValueError, KeyError):
-            continue
-    return False
+    return now_ms - last_seen_ms <= within_seconds * 1000
 
 
-def poll_currently_playing(sp, config: Dict[str, Any], log: Dict[str, Any], verbose: bool = True) -> int:
+def poll_currently_playing(
+    sp,
+    config: Dict[str, Any],
+    log: Dict[str, Any],
+    verbose: bool = True,
+    ctx: Optional[Dict[str, Any]] = None,
+) -> int:
     """
     Check what's currently playing and record it if it's a new track.
     
     This captures plays that don't show up in recently-played (e.g., Spotify Jams).
+    The play is timestamped with the run's clock, so it lands in the log for
+    the day the poll started even if the poll crosses midnight.
     
     Returns number of new plays added.
     """
-    tz = pytz.timezone(config["timezone"])
-    now = datetime.now(tz)
-    now_utc = datetime.now(pytz.UTC)
+    ctx = ctx or get_run_context(config)
+    played_at_str = ctx["now_utc"].strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    played_at_ms = timestamp_ms(played_at_str)
     
     try:
         current = retry_on_timeout(lambda: sp.current_playback())
@@ -1084,27 +2248,23 @@ def poll_currently_playing(sp, config: Dict[str, Any], log: Dict[str, Any], verb
     
     # New track! But check if we already have a recent play of it
     # (to avoid double-counting from recently-played endpoint)
-    if has_recent_play(log, track_id, within_seconds=300):
+    if has_recent_play(log, track_id, played_at_ms, within_seconds=300):
         if verbose:
             print(f"  Currently: {track_name} — {artist} (already recorded)")
         log["last_current_track_id"] = track_id
         return 0
     
     # Record the play
-    played_at_str = now_utc.strftime("%Y-%m-%dT%H:%M:%S.000Z")
-    
     play_record = {
         "track_id": track_id,
-        "track_name": track_name,
-        "artist": artist,
         "played_at": played_at_str,
-        "duration_ms": item.get("duration_ms", 0),
-        "type": item.get("type", "track"),
+        "played_at_ms": played_at_ms,
         "context_type": current.get("context", {}).get("type") if current.get("context") else None,
         "source": "current_playback",  # Mark source for debugging
     }
     
-    log["plays"].append(play_record)
+    record_track_metadata({track_id: track_metadata(item)})
+    add_play(log, play_record)
     log["last_current_track_id"] = track_id
     
     if verbose:
@@ -1113,27 +2273,46 @@ def poll_currently_playing(sp, config: Dict[str, Any], log: Dict[str, Any], verb
     return 1
 
 
-def poll_listening_history(sp, config: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
+def poll_listening_history(
+    sp,
+    config: Dict[str, Any],
+    verbose: bool = True,
+    log: Optional[Dict[str, Any]] = None,
+    ctx: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
     Fetch recently played tracks AND currently playing, merge into today's log.
     
+    Args:
+        log: Today's log from a previous poll (--daemon keeps it in memory).
+             Ignored if it belongs to another day; loaded from disk if None.
+        ctx: The run's context from get_run_context (built here if not given;
+             --daemon builds a fresh one every cycle)
+    
     Returns the updated daily log.
     """
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
-    now = datetime.now(tz)
+    ctx = ctx or get_run_context(config)
+    tz = ctx["tz"]
+    today = ctx["today"]
+    now = ctx["now"]
     
     if verbose:
         print(f"Polling listening history for {today} ({config['timezone']})")
     
-    # Load existing log
-    log = load_daily_log(today)
+    # First poll of a new day: fold earlier days' journals into their day files
+    if not use_state_db() and not get_daily_journal_path(today).exists():
+        compact_daily_journals(before=today)
+    
+    # Load existing log (unless the caller already holds today's)
+    if log is None or log.get("date") != today.isoformat():
+        log = load_daily_log(today)
     
     # Ensure last_current_track_id exists (for older log files)
     if "last_current_track_id" not in log:
         log["last_current_track_id"] = None
     
     existing_played_at = {p["played_at"] for p in log["plays"]}
+    plays_before = len(log["plays"])
     
     # === Part 1: Recently played (official history) ===
     # Use retry logic for transient network errors
@@ -1143,17 +2322,17 @@ def poll_listening_history(sp, config: Dict[str, Any], verbose: bool = True) ->
     if verbose:
         print(f"  Recently played: Fetched {len(items)} tracks from Spotify")
     
+    day_start_ms, day_end_ms = day_bounds_ms(today, tz)
     new_from_history = 0
+    new_tracks: Dict[str, Dict[str, Any]] = {}
     for item in items:
         played_at_str = item.get("played_at")
         if not played_at_str:
             continue
         
-        # Parse and check if this play is from today
-        played_at_utc = parse_played_at(played_at_str)
-        played_at_local = played_at_utc.astimezone(tz)
-        
-        if played_at_local.date() != today:
+        # Check if this play is from today
+        played_at_ms = timestamp_ms(played_at_str)
+        if not day_start_ms <= played_at_ms < day_end_ms:
             continue  # Not today's play
         
         if played_at_str in existing_played_at:
@@ -1168,41 +2347,37 @@ def poll_listening_history(sp, config: Dict[str, Any], verbose: bool = True) ->
         if not track_id:
             continue  # Skip local files
         
-        # Build play record
+        # Build play record (track metadata is stored separately)
         play_record = {
             "track_id": track_id,
-            "track_name": track.get("name", "Unknown"),
-            "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
             "played_at": played_at_str,
-            "duration_ms": track.get("duration_ms", 0),
-            "type": track.get("type", "track"),
+            "played_at_ms": played_at_ms,
             "context_type": item.get("context", {}).get("type") if item.get("context") else None,
             "source": "recently_played",
         }
         
-        log["plays"].append(play_record)
+        new_tracks[track_id] = track_metadata(track)
+        add_play(log, play_record)
         existing_played_at.add(played_at_str)
         new_from_history += 1
     
+    record_track_metadata(new_tracks)
+    
     if verbose:
         print(f"  Recently played: Added {new_from_history} new plays")
     
     # === Part 2: Currently playing (catches Jams, etc.) ===
-    new_from_current = poll_currently_playing(sp, config, log, verbose=verbose)
+    new_from_current = poll_currently_playing(sp, config, log, verbose=verbose, ctx=ctx)
     
     # === Finalize ===
-    # Recompute play counts from all plays
-    play_counts: Dict[str, int] = {}
-    for play in log["plays"]:
-        tid = play["track_id"]
-        play_counts[tid] = play_counts.get(tid, 0) + 1
-    log["play_counts"] = play_counts
-    
     # Update last poll time
     log["last_poll"] = now.isoformat()
     
-    # Save
-    save_daily_log(today, log)
+    # Append only this poll's plays (play_counts were updated by add_play)
+    append_daily_log(today, log, log["plays"][plays_before:])
+    update_play_aggregates(today, log, plays_before)
+    
+    play_counts = log["play_counts"]
     
     total_new = new_from_history + new_from_current
     if verbose:
@@ -1210,15 +2385,86 @@ def poll_listening_history(sp, config: Dict[str, Any], verbose: bool = True) ->
         if play_counts:
             top_tracks = sorted(play_counts.items(), key=lambda x: x[1], reverse=True)[:5]
             print(f"  Top tracks by play count:")
+            tracks = get_log_track_metadata(log)
             for tid, count in top_tracks:
-                # Find track name
-                name = next((p["track_name"] for p in log["plays"] if p["track_id"] == tid), tid)
-                artist = next((p["artist"] for p in log["plays"] if p["track_id"] == tid), "")
-                print(f"    {count}x - {name} — {artist}")
+                print(f"    {count}x - {format_track(tracks, tid)}")
     
     return log
 
 
+def get_state_lock_path() -> Path:
+    """
+    Return path to the profile's lock file.
+    
+    Every command that reads or writes the profile's state holds this lock
+    (see state_io.state_lock). Polls skip a cycle if it's busy, while
+    finalize, status, weekly summary and migration wait for it.
+    """
+    return get_state_dir() / "state.lock"
+
+
+def run_daemon(
+    sp,
+    config: Dict[str, Any],
+    interval: float,
+    verbose: bool = True,
+) -> int:
+    """
+    Poll listening history every `interval` seconds until SIGTERM/SIGINT.
+    
+    Replaces the per-minute --poll cron job: the Spotify client, config and
+    today's log stay in memory between polls, so each cycle costs only the
+    two Spotify requests instead of a full process startup.
+    
+    Transient errors skip a cycle (same as --poll), as does another run holding
+    the profile's state lock. invalid_grant and other unexpected errors
+    propagate so the caller can notify and exit.
+    
+    Returns exit code 0 after a clean shutdown.
+    """
+    stop = threading.Event()
+    
+    def request_stop(signum, frame):
+        stop.set()
+    
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    
+    if verbose:
+        print(f"Daemon started: polling every {interval:g}s (SIGTERM to stop)")
+    
+    log: Optional[Dict[str, Any]] = None
+    log_version: Optional[int] = None
+    
+    while not stop.is_set():
+        with state_lock(get_state_lock_path(), blocking=False) as locked:
+            if not locked:
+                if verbose:
+                    print("⏭ Another run is using this profile's state; skipping this cycle")
+            else:
+                # Another process (e.g. --status) may have written today's log since
+                # our last poll; if so, reload it instead of clobbering its plays.
+                if log is not None:
+                    if get_daily_log_version(date.fromisoformat(log["date"])) != log_version:
+                        log = None
+                
+                try:
+                    log = poll_listening_history(sp, config, verbose=verbose, log=log)
+                    log_version = get_daily_log_version(date.fromisoformat(log["date"]))
+                except TRANSIENT_ERRORS as e:
+                    if not _is_transient(e):
+                        raise
+                    print(f"⚠ Transient error during poll, will retry next cycle: {e}",
+                          file=sys.stderr)
+                flush_retry_log()
+        
+        stop.wait(interval)
+    
+    if verbose:
+        print("Daemon stopped.")
+    return 0
+
+
 # =============================================================================
 # Playlist Operations
 # =============================================================================
@@ -1299,64 +2545,117 @@ def get_playlist_id(sp, config: Dict[str, Any], create_if_missing: bool = True)
 
 def fetch_playlist_tracks(sp, playlist_id: str) -> List[Dict[str, Any]]:
     """
-    Fetch all tracks from a playlist (handles pagination).
+    Fetch all tracks from a playlist (pages are fetched in parallel, see
+    spotify_paging.fetch_all_items).
     
-    Returns list of track info dicts with: track_id, track_name, artist, added_at, position
+    Returns list of track info dicts with: track_id, track_name, artist,
+    added_at (and added_at_ms, epoch milliseconds), duration_ms, position
     """
-    tracks = []
-    position = 0
-    
-    results = retry_on_timeout(lambda: sp.playlist_items(
-        playlist_id,
-        additional_types=("track",),
-        fields="items(added_at,track(id,name,artists(name),duration_ms,type)),next",
+    items = fetch_all_items(
+        lambda offset, limit: retry_on_timeout(lambda: sp.playlist_items(
+            playlist_id,
+            additional_types=("track",),
+            fields="items(added_at,track(id,name,artists(name),duration_ms,type)),total",
+            limit=limit,
+            offset=offset,
+        )),
         limit=100,
-    ))
+    )
     
-    while results:
-        for item in results.get("items", []):
-            track = item.get("track")
-            if not track or not track.get("id"):
-                position += 1
-                continue  # Skip local files or unavailable tracks
-            
-            tracks.append({
-                "track_id": track["id"],
-                "track_name": track.get("name", "Unknown"),
-                "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
-                "added_at": item.get("added_at", ""),
-                "duration_ms": track.get("duration_ms", 0),
-                "position": position,
-            })
-            position += 1
+    tracks = []
+    for position, item in enumerate(items):
+        track = item.get("track")
+        if not track or not track.get("id"):
+            continue  # Skip local files or unavailable tracks
         
-        if results.get("next"):
-            results = retry_on_timeout(lambda: sp.next(results))
-        else:
-            break
+        added_at = item.get("added_at") or ""
+        try:
+            added_at_ms = timestamp_ms(added_at) if added_at else None
+        except ValueError:
+            added_at_ms = None
+        
+        tracks.append({
+            "track_id": track["id"],
+            "track_name": track.get("name", "Unknown"),
+            "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
+            "added_at": added_at,
+            "added_at_ms": added_at_ms,
+            "duration_ms": track.get("duration_ms", 0),
+            "position": position,
+        })
     
     return tracks
 
 
 def load_playlist_snapshot() -> Optional[Dict[str, Any]]:
     """Load the playlist snapshot from disk, or None if not exists."""
-    snapshot_path = get_snapshot_path()
-    if snapshot_path.exists():
+    if use_state_db():
+        snapshot = _db_load_snapshot()
+    else:
+        snapshot_path = get_snapshot_path()
+        if not snapshot_path.exists():
+            return None
         with open(snapshot_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return None
+            snapshot = json.load(f)
+    if snapshot and isinstance(snapshot.get("cooldown"), dict):
+        snapshot["cooldown"] = CooldownTracker.from_dict(snapshot["cooldown"])
+    return snapshot
+
+
+def _snapshot_for_storage(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """The snapshot with its CooldownTracker (if any) converted to plain data."""
+    if isinstance(snapshot.get("cooldown"), CooldownTracker):
+        return {**snapshot, "cooldown": snapshot["cooldown"].to_dict()}
+    return snapshot
 
 
 def save_playlist_snapshot(snapshot: Dict[str, Any]) -> None:
     """Save the playlist snapshot to disk."""
+    snapshot = _snapshot_for_storage(snapshot)
+    if use_state_db():
+        _db_save_snapshot(get_state_db(), snapshot)
+        return
     snapshot_path = get_snapshot_path()
-    with open(snapshot_path, "w", encoding="utf-8") as f:
-        json.dump(snapshot, f, indent=2)
+    write_json_atomic(snapshot_path, snapshot)
+
+
+def get_playlist_snapshot_id(sp, playlist_id: str) -> Optional[str]:
+    """
+    Fetch just the playlist's snapshot_id (Spotify's version tag, which changes
+    whenever the playlist is modified).
+    
+    Returns the snapshot_id, or None if the response didn't include one.
+    """
+    result = retry_on_timeout(lambda: sp.playlist(playlist_id, fields="snapshot_id"))
+    return (result or {}).get("snapshot_id")
+
 
+def take_playlist_snapshot(
+    sp, config: Dict[str, Any], ctx: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Get current playlist state and save as snapshot.
+    
+    If a snapshot is saved, only the playlist's snapshot_id is requested and
+    the saved tracks are reused when it hasn't changed (see
+    refresh_playlist_snapshot); otherwise every page is fetched.
+    
+    Returns the snapshot dict, or None if playlist not found.
+    """
+    cached = load_playlist_snapshot()
+    if cached:
+        return refresh_playlist_snapshot(sp, config, cached, ctx=ctx)
+    return fetch_playlist_snapshot(sp, config, ctx=ctx)
 
-def take_playlist_snapshot(sp, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+
+def fetch_playlist_snapshot(
+    sp, config: Dict[str, Any], ctx: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
     """
-    Fetch current playlist state and save as snapshot.
+    Fetch the full playlist and save it as the snapshot.
+    
+    The playlist's snapshot_id is stored with the tracks so later checks can
+    tell whether the playlist has changed (see refresh_playlist_snapshot).
     
     Returns the snapshot dict, or None if playlist not found.
     """
@@ -1364,27 +2663,92 @@ def take_playlist_snapshot(sp, config: Dict[str, Any]) -> Optional[Dict[str, Any
     if not playlist_id:
         return None
     
-    tz = pytz.timezone(config["timezone"])
-    now = datetime.now(tz)
+    ctx = ctx or get_run_context(config)
     
+    # Read the version first: if the playlist changes mid-fetch, the stored id
+    # is stale and the next check re-fetches
+    snapshot_id = get_playlist_snapshot_id(sp, playlist_id)
     tracks = fetch_playlist_tracks(sp, playlist_id)
     
     snapshot = {
         "playlist_id": playlist_id,
         "playlist_name": config.get("playlist_name", ""),
-        "last_checked": now.isoformat(),
+        "snapshot_id": snapshot_id,
+        "last_checked": ctx["now"].isoformat(),
         "track_count": len(tracks),
         "tracks": tracks,
+        "cooldown": CooldownTracker.from_tracks(tracks, config.get("cooldown_entries", 90)),
     }
     
     save_playlist_snapshot(snapshot)
     return snapshot
 
 
+def refresh_playlist_snapshot(
+    sp, config: Dict[str, Any], snapshot: Dict[str, Any], ctx: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Bring an in-memory snapshot up to date with one cheap request.
+    
+    If the playlist's current snapshot_id matches the snapshot's, the snapshot
+    is still accurate and is saved and returned as-is; otherwise (or if it has
+    no snapshot_id) the playlist is fetched again with fetch_playlist_snapshot.
+    
+    Returns the up-to-date snapshot, or None if playlist not found.
+    """
+    playlist_id = get_playlist_id(sp, config)
+    if (
+        snapshot.get("snapshot_id")
+        and snapshot.get("playlist_id") == playlist_id
+        and get_playlist_snapshot_id(sp, playlist_id) == snapshot["snapshot_id"]
+    ):
+        ctx = ctx or get_run_context(config)
+        snapshot["last_checked"] = ctx["now"].isoformat()
+        save_playlist_snapshot(snapshot)
+        return snapshot
+    return fetch_playlist_snapshot(sp, config, ctx=ctx)
+
+
+def append_to_snapshot(
+    snapshot: Dict[str, Any],
+    track: Dict[str, Any],
+    snapshot_id: Optional[str],
+    ctx: Dict[str, Any],
+) -> None:
+    """
+    Record a track we just appended to the playlist in the in-memory snapshot.
+    
+    snapshot_id is the one returned by the add request, i.e. the playlist's
+    version including this track, so refresh_playlist_snapshot still matches
+    as long as nothing else has changed the playlist. The track's added_at is
+    the run's time (ctx["now_utc"]).
+    """
+    tracks = snapshot.setdefault("tracks", [])
+    # Positions come from the raw playlist items, which may include skipped
+    # local/unavailable entries, so continue after the last one we stored
+    # rather than counting tracks.
+    position = tracks[-1]["position"] + 1 if tracks else 0
+    added_at = ctx["now_utc"].strftime("%Y-%m-%dT%H:%M:%SZ")
+    tracks.append({
+        "track_id": track["track_id"],
+        "track_name": track.get("track_name", "Unknown"),
+        "artist": track.get("artist", "Unknown"),
+        "added_at": added_at,
+        "added_at_ms": timestamp_ms(added_at),
+        "duration_ms": track.get("duration_ms", 0),
+        "position": position,
+    })
+    snapshot["track_count"] = len(tracks)
+    snapshot["snapshot_id"] = snapshot_id
+    if isinstance(snapshot.get("cooldown"), CooldownTracker):
+        snapshot["cooldown"].append(track["track_id"])
+
+
 def detect_daily_addition(
     sp, 
     config: Dict[str, Any], 
-    verbose: bool = True
+    verbose: bool = True,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Detect if a song was added to the playlist today.
@@ -1399,11 +2763,14 @@ def detect_daily_addition(
         - needs_song: bool - whether we need to auto-add a song
         - current_snapshot: dict - the current playlist state
     """
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
-    
-    # Take fresh snapshot
-    new_snapshot = take_playlist_snapshot(sp, config)
+    ctx = ctx or get_run_context(config)
+    tz = ctx["tz"]
+    today = ctx["today"]
+    
+    # Take fresh snapshot (keeping the previous count to report changes)
+    old_snapshot = load_playlist_snapshot()
+    old_count = old_snapshot.get("track_count", 0) if old_snapshot else None
+    new_snapshot = take_playlist_snapshot(sp, config, ctx=ctx)
     if not new_snapshot:
         return {
             "added_today": False,
@@ -1414,28 +2781,23 @@ def detect_daily_addition(
         }
     
     # Check ALL tracks for today's date (not just new ones since last snapshot)
+    day_start_ms, day_end_ms = day_bounds_ms(today, tz)
     todays_tracks = []
     for track in new_snapshot["tracks"]:
-        added_at = track.get("added_at", "")
-        if added_at:
-            try:
-                # Parse added_at (ISO 8601)
-                added_dt = datetime.fromisoformat(added_at.replace("Z", "+00:00"))
-                added_local = added_dt.astimezone(tz)
-                if added_local.date() == today:
-                    todays_tracks.append(track)
-                    if verbose:
-                        print(f"  Found song added today: {track['track_name']} — {track['artist']}")
-            except (ValueError, TypeError):
-                pass
+        try:
+            added_at_ms = record_time_ms(track, "added_at")
+        except (ValueError, TypeError):
+            continue
+        if added_at_ms is not None and day_start_ms <= added_at_ms < day_end_ms:
+            todays_tracks.append(track)
+            if verbose:
+                print(f"  Found song added today: {track['track_name']} — {track['artist']}")
     
     added_today = len(todays_tracks) > 0
     needs_song = not added_today
     
     if verbose:
-        old_snapshot = load_playlist_snapshot()
-        if old_snapshot:
-            old_count = old_snapshot.get("track_count", 0)
+        if old_count is not None:
             new_count = new_snapshot["track_count"]
             if new_count > old_count:
                 print(f"  Playlist grew: {old_count} → {new_count} tracks")
@@ -1454,22 +2816,123 @@ def detect_daily_addition(
 # Song Selection Algorithm
 # =============================================================================
 
-def get_cooldown_track_ids(snapshot: Dict[str, Any], cooldown: int) -> set:
+# Playlist entries kept for cooldown violation reports (the nightly email's
+# "Recent songs" list), even when the cooldown itself is shorter
+COOLDOWN_REPORT_TAIL = 5
+
+
+class CooldownTracker:
     """
-    Get track IDs that are in the cooldown period (last N entries).
+    Sliding window over the newest playlist entries for cooldown checks.
     
-    These tracks are not eligible for selection.
+    Keeps a bounded deque of (track_id, previous position of the same track)
+    for the last max(cooldown, history) entries, plus a map of
+    track_id -> newest position in that window. Membership ("is this track in
+    cooldown?") and per-entry violation checks are O(1), however long the
+    cooldown. Positions are indexes into the snapshot's track list.
+    
+    Stored in the snapshot under "cooldown" (see save_playlist_snapshot) and
+    advanced by append_to_snapshot.
+    """
+    
+    def __init__(self, cooldown: int, history: int = COOLDOWN_REPORT_TAIL):
+        self.cooldown = max(0, cooldown)
+        self.maxlen = max(self.cooldown, history)
+        self.count = 0  # entries seen (= position of the next entry)
+        self.entries: deque = deque()
+        self.positions: Dict[str, int] = {}
+    
+    @classmethod
+    def from_tracks(
+        cls, tracks: List[Dict[str, Any]], cooldown: int, history: int = COOLDOWN_REPORT_TAIL
+    ) -> "CooldownTracker":
+        tracker = cls(cooldown, history)
+        for track in tracks:
+            tracker.append(track["track_id"])
+        return tracker
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CooldownTracker":
+        tracker = cls(data["cooldown"])
+        tracker.count = data["count"]
+        start = tracker.count - len(data["entries"])
+        for offset, (track_id, prev) in enumerate(data["entries"]):
+            tracker.entries.append((track_id, prev))
+            tracker.positions[track_id] = start + offset
+        return tracker
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"cooldown": self.cooldown, "count": self.count, "entries": [list(e) for e in self.entries]}
+    
+    def append(self, track_id: str) -> None:
+        """Record a new entry at the end of the playlist."""
+        prev = self.positions.get(track_id)
+        if len(self.entries) >= self.maxlen:
+            old_id, _ = self.entries.popleft()
+            if self.positions.get(old_id) == self.count - len(self.entries) - 1:
+                del self.positions[old_id]
+        self.entries.append((track_id, prev))
+        self.positions[track_id] = self.count
+        self.count += 1
+    
+    def __contains__(self, track_id: str) -> bool:
+        """True if track_id is one of the last `cooldown` entries."""
+        pos = self.positions.get(track_id)
+        return pos is not None and pos >= self.count - self.cooldown
+    
+    def __len__(self) -> int:
+        """Number of distinct tracks currently in cooldown."""
+        return sum(1 for pos in self.positions.values() if pos >= self.count - self.cooldown)
+    
+    def violations(self, tail: int = COOLDOWN_REPORT_TAIL) -> List[Tuple[int, int]]:
+        """
+        (prior_index, new_index) for each of the last `tail` entries (at most
+        maxlen) that repeats a track within `cooldown` entries of its previous slot.
+        """
+        if self.cooldown <= 0:
+            return []
+        out = []
+        start = self.count - len(self.entries)
+        for offset, (_, prev) in enumerate(self.entries):
+            i = start + offset
+            if i >= self.count - tail and prev is not None and i - prev <= self.cooldown:
+                out.append((prev, i))
+        return out
+
+
+class _AnyOf:
+    """Membership test across several containers without merging them."""
+    
+    def __init__(self, *containers):
+        self.containers = containers
+    
+    def __contains__(self, item) -> bool:
+        return any(item in c for c in self.containers)
+
+
+def get_cooldown_tracker(snapshot: Dict[str, Any], cooldown: int) -> CooldownTracker:
+    """
+    Return the snapshot's cooldown tracker, (re)building it from the track
+    list if it's missing, was built for another cooldown, or is out of step
+    with the tracks.
     """
     tracks = snapshot.get("tracks", [])
-    # Get last N tracks by position
-    cooldown_tracks = tracks[-cooldown:] if len(tracks) >= cooldown else tracks
-    return {t["track_id"] for t in cooldown_tracks}
+    tracker = snapshot.get("cooldown")
+    if (
+        not isinstance(tracker, CooldownTracker)
+        or tracker.cooldown != max(0, cooldown)
+        or tracker.count != len(tracks)
+    ):
+        tracker = CooldownTracker.from_tracks(tracks, cooldown)
+        snapshot["cooldown"] = tracker
+    return tracker
 
 
 def find_cooldown_violations_in_tail(
     tracks: List[Dict[str, Any]],
     cooldown: int,
-    tail: int = 5,
+    tail: int = COOLDOWN_REPORT_TAIL,
+    tracker: Optional[CooldownTracker] = None,
 ) -> List[Dict[str, Any]]:
     """
     Find tracks whose newest occurrence breaks the same rule as auto-selection:
@@ -1478,38 +2941,38 @@ def find_cooldown_violations_in_tail(
     tracks: oldest first, newest last (playlist snapshot order).
     Only reports violations whose newer occurrence lies in the last `tail` positions
     (the same region as the nightly email "Recent songs" list).
+    tracker: the snapshot's CooldownTracker for these tracks, if available
+    (otherwise one is built from `tracks` in a single pass).
     """
     if cooldown <= 0 or len(tracks) < 2 or tail <= 0:
         return []
 
-    first_new_index = max(0, len(tracks) - tail)
+    if (
+        tracker is None
+        or tracker.cooldown != cooldown
+        or tracker.count != len(tracks)
+        or tracker.maxlen < tail
+    ):
+        tracker = CooldownTracker.from_tracks(tracks, cooldown, history=tail)
+
     out: List[Dict[str, Any]] = []
-    for i in range(max(1, first_new_index), len(tracks)):
-        tid = tracks[i]["track_id"]
-        window_start = max(0, i - cooldown)
-        prev_j: Optional[int] = None
-        for j in range(i - 1, window_start - 1, -1):
-            if tracks[j]["track_id"] == tid:
-                prev_j = j
-                break
-        if prev_j is not None:
-            between = i - prev_j - 1
-            out.append(
-                {
-                    "track_name": tracks[i]["track_name"],
-                    "artist": tracks[i]["artist"],
-                    "track_id": tid,
-                    "prior_index": prev_j,
-                    "new_index": i,
-                    "entries_between": between,
-                }
-            )
+    for prev_j, i in tracker.violations(tail):
+        out.append(
+            {
+                "track_name": tracks[i]["track_name"],
+                "artist": tracks[i]["artist"],
+                "track_id": tracks[i]["track_id"],
+                "prior_index": prev_j,
+                "new_index": i,
+                "entries_between": i - prev_j - 1,
+            }
+        )
     return out
 
 
 def is_eligible(
     track: Dict[str, Any], 
-    cooldown_ids: set, 
+    cooldown_ids: Container[str], 
     min_duration_ms: int
 ) -> Tuple[bool, str]:
     """
@@ -1535,51 +2998,68 @@ def is_eligible(
     return True, "eligible"
 
 
-def get_candidates_from_days(
-    days: List[date], 
-    cooldown_ids: set, 
+# Days of listening history the selection cascade looks back over ("last week")
+PLAY_INDEX_DAYS = 7
+
+
+def build_play_index(today: date, num_days: int = PLAY_INDEX_DAYS) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the play index the selection cascade queries.
+    
+    Read from play-aggregates.json (see update_play_aggregates), so no daily
+    logs are loaded. Maps each track_id played in the last num_days days to:
+        - windows: play counts per AGGREGATE_WINDOWS window ({"1": n, ...})
+        - play: a play record for the track's most recent play, joined with
+          its track metadata
+    
+    Returns the index; get_candidates_from_index answers each cascade level
+    from it.
+    """
+    aggregates = load_play_aggregates(today)
+    tracks = load_track_metadata()
+    oldest = (today - timedelta(days=num_days - 1)).isoformat()
+    index: Dict[str, Dict[str, Any]] = {}
+    for track_id, entry in aggregates["tracks"].items():
+        if not any(day >= oldest for day in entry["daily"]):
+            continue
+        # (aggregates written before normalization also carry metadata inline)
+        play = {f: entry[f] for f in TRACK_METADATA_FIELDS if f in entry}
+        play.update({"track_id": track_id, "played_at": entry.get("last_played", "")})
+        index[track_id] = {"windows": entry["windows"], "play": join_play(play, tracks)}
+    return index
+
+
+def get_candidates_from_index(
+    play_index: Dict[str, Dict[str, Any]],
+    window_days: int,
+    cooldown_ids: Container[str],
     min_duration_ms: int,
     verbose: bool = True
 ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
     """
-    Build candidate pool from listening history over multiple days.
+    Build candidate pool from the play index over the last window_days days
+    (one of AGGREGATE_WINDOWS).
     
     Returns (candidates, play_counts) where:
-    - candidates: list of unique eligible tracks
-    - play_counts: dict of track_id -> total play count across all days
+    - candidates: list of unique eligible tracks (most recent play's info)
+    - play_counts: dict of track_id -> total play count across the window
     """
-    seen_tracks: Dict[str, Dict[str, Any]] = {}  # track_id -> track info
-    total_play_counts: Dict[str, int] = {}
+    candidates = []
+    eligible_counts: Dict[str, int] = {}
     
-    for day in days:
-        log = load_daily_log(day)
+    for track_id, entry in play_index.items():
+        count = entry["windows"].get(str(window_days), 0)
+        if not count:
+            continue
+        track = entry["play"]
         
-        for play in log.get("plays", []):
-            track_id = play["track_id"]
-            
-            # Accumulate play counts
-            total_play_counts[track_id] = total_play_counts.get(track_id, 0) + 1
-            
-            # Store track info (use most recent play's info)
-            if track_id not in seen_tracks:
-                seen_tracks[track_id] = play
-    
-    # Filter to eligible tracks
-    candidates = []
-    for track_id, track in seen_tracks.items():
         eligible, reason = is_eligible(track, cooldown_ids, min_duration_ms)
         if eligible:
             candidates.append(track)
+            eligible_counts[track_id] = count
         elif verbose:
             print(f"    Skipping {track['track_name']}: {reason}")
     
-    # Only include play counts for eligible candidates
-    eligible_counts = {
-        tid: count 
-        for tid, count in total_play_counts.items() 
-        if tid in {c["track_id"] for c in candidates}
-    }
-    
     return candidates, eligible_counts
 
 
@@ -1636,67 +3116,59 @@ def select_song_from_candidates(
     return selected
 
 
+def sync_liked_songs_mirror(sp) -> None:
+    """
+    Bring the shared Liked Songs mirror up to date (see liked_songs_mirror).
+    
+    Usually one request for the newest page; skipped if this process already
+    synced within the last minute (finalize may select several songs).
+    """
+    ensure_synced(lambda offset, limit: retry_on_timeout(
+        lambda: sp.current_user_saved_tracks(limit=limit, offset=offset)
+    ))
+
+
+def _track_from_liked_song(song: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a Liked Songs mirror entry to the track dict selection uses."""
+    return {
+        "track_id": song["track_id"],
+        "track_name": song.get("track_name", "Unknown"),
+        "artist": ", ".join(a.get("name", "?") for a in song.get("artists", [])),
+        "duration_ms": song.get("duration_ms", 0),
+        "type": song.get("type", "track"),
+        "added_at": song["added_at"],
+        "played_at": song["added_at"],  # For compatibility with play_counts lookup
+    }
+
+
 def fetch_todays_liked_songs(
     sp, 
     config: Dict[str, Any],
-    verbose: bool = True
+    verbose: bool = True,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetch songs that were added to Liked Songs today.
     
-    Returns tracks liked on the effective date (respects day_boundary_hour).
-    Since Liked Songs are sorted newest first, we can stop once we hit
-    songs from previous days.
+    Returns tracks liked on the effective date (respects day_boundary_hour),
+    read from the Liked Songs mirror after syncing it.
     """
-    tz = pytz.timezone(config["timezone"])
-    effective_date = get_effective_date(config)
+    ctx = ctx or get_run_context(config)
+    tz = ctx["tz"]
+    effective_date = ctx["effective_date"]
     
-    tracks = []
-    results = retry_on_timeout(lambda: sp.current_user_saved_tracks(limit=50))
+    sync_liked_songs_mirror(sp)
     
-    while results:
-        found_older = False
-        for item in results.get("items", []):
-            added_at = item.get("added_at", "")
-            if not added_at:
-                continue
-            
-            # Parse the added_at timestamp
-            try:
-                added_dt = datetime.fromisoformat(added_at.replace("Z", "+00:00"))
-                added_local = added_dt.astimezone(tz)
-                added_date = added_local.date()
-            except (ValueError, TypeError):
-                continue
-            
-            # Check if this was liked today (on the effective date)
-            if added_date < effective_date:
-                # Songs are sorted newest first, so we can stop here
-                found_older = True
-                break
-            
-            if added_date == effective_date:
-                track = item.get("track")
-                if not track or not track.get("id"):
-                    continue
-                
-                tracks.append({
-                    "track_id": track["id"],
-                    "track_name": track.get("name", "Unknown"),
-                    "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
-                    "duration_ms": track.get("duration_ms", 0),
-                    "type": track.get("type", "track"),
-                    "added_at": added_at,
-                    "played_at": added_at,  # For compatibility with play_counts lookup
-                })
-        
-        if found_older:
-            break
-        
-        if results.get("next"):
-            results = retry_on_timeout(lambda: sp.next(results))
-        else:
-            break
+    # added_at is UTC, so start a day early and compare against the local day
+    day_start_ms, day_end_ms = day_bounds_ms(effective_date, tz)
+    tracks = []
+    for song in get_liked_songs(since=(effective_date - timedelta(days=1)).isoformat()):
+        try:
+            added_at_ms = timestamp_ms(song["added_at"])
+        except (ValueError, TypeError):
+            continue
+        if day_start_ms <= added_at_ms < day_end_ms:
+            tracks.append(_track_from_liked_song(song))
     
     if verbose and tracks:
         print(f"  Found {len(tracks)} song(s) liked today")
@@ -1707,31 +3179,13 @@ def fetch_todays_liked_songs(
 def fetch_liked_songs_sample(sp, limit: int = 200) -> List[Dict[str, Any]]:
     """
     Fetch a sample of the user's Liked Songs for fallback selection.
-    """
-    tracks = []
-    results = retry_on_timeout(lambda: sp.current_user_saved_tracks(limit=50))
     
-    while results and len(tracks) < limit:
-        for item in results.get("items", []):
-            track = item.get("track")
-            if not track or not track.get("id"):
-                continue
-            
-            tracks.append({
-                "track_id": track["id"],
-                "track_name": track.get("name", "Unknown"),
-                "artist": ", ".join(a.get("name", "?") for a in track.get("artists", [])),
-                "duration_ms": track.get("duration_ms", 0),
-                "type": track.get("type", "track"),
-                "played_at": item.get("added_at", ""),  # Use liked date as proxy
-            })
-        
-        if results.get("next") and len(tracks) < limit:
-            results = retry_on_timeout(lambda: sp.next(results))
-        else:
-            break
-    
-    return tracks
+    Drawn uniformly from the whole library via the Liked Songs mirror, so old
+    likes are as likely as recent ones and the cost doesn't grow with the
+    library.
+    """
+    sync_liked_songs_mirror(sp)
+    return [_track_from_liked_song(song) for song in sample_liked_songs(limit)]
 
 
 def select_song(
@@ -1750,7 +3204,7 @@ def select_song(
     2. Last 2 days
     3. Last 3 days
     4. Last week
-    5. Liked Songs (random sample)
+    5. Liked Songs (uniform random sample of the whole library)
     
     Args:
         extra_exclude_ids: Additional track IDs to exclude (e.g., tracks already
@@ -1766,6 +3220,8 @@ def select_song_with_candidates(
     snapshot: Dict[str, Any],
     verbose: bool = True,
     extra_exclude_ids: Optional[set] = None,
+    play_index: Optional[Dict[str, Dict[str, Any]]] = None,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     Select a song to add to the playlist, returning both the selection and candidates.
@@ -1776,32 +3232,42 @@ def select_song_with_candidates(
     2. Last 2 days
     3. Last 3 days
     4. Last week
-    5. Liked Songs (random sample)
+    5. Liked Songs (uniform random sample of the whole library)
     
     Args:
         extra_exclude_ids: Additional track IDs to exclude (e.g., tracks already
                           added in this run when adding multiple songs)
+        play_index: Index from build_play_index, reused across calls in one run
+                    (built here if not given). Excluded tracks are removed
+                    from it in place.
+        ctx: The run's context from get_run_context (built here if not given)
     
     Returns:
         Tuple of (selected_track, liked_today_candidates, listened_candidates)
     """
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
+    ctx = ctx or get_run_context(config)
+    today = ctx["today"]
     
     cooldown = config.get("cooldown_entries", 90)
     min_duration = config.get("min_duration_ms", 50_000)
     selection_mode = config.get("selection_mode", "weighted_random")
     prefer_liked = config.get("prefer_liked_songs", True)
     
-    cooldown_ids = get_cooldown_track_ids(snapshot, cooldown)
+    cooldown_tracker = get_cooldown_tracker(snapshot, cooldown)
+    cooldown_ids: Container[str] = cooldown_tracker
+    
+    if play_index is None:
+        play_index = build_play_index(today)
     
     # Add extra exclusions if provided
     if extra_exclude_ids:
-        cooldown_ids = cooldown_ids | extra_exclude_ids
+        cooldown_ids = _AnyOf(cooldown_tracker, extra_exclude_ids)
+        for track_id in extra_exclude_ids:
+            play_index.pop(track_id, None)
     
     if verbose:
         if cooldown > 0:
-            print(f"  Cooldown: {len(cooldown_ids)} tracks in last {cooldown} entries")
+            print(f"  Cooldown: {len(cooldown_tracker)} tracks in last {cooldown} entries")
         else:
             print(f"  Cooldown: disabled (repeats allowed)")
         print(f"  Selection mode: {selection_mode}")
@@ -1816,7 +3282,7 @@ def select_song_with_candidates(
         if verbose:
             print(f"\n  Trying songs liked today...")
         
-        todays_liked = fetch_todays_liked_songs(sp, config, verbose=False)
+        todays_liked = fetch_todays_liked_songs(sp, config, verbose=False, ctx=ctx)
         
         # Filter to eligible tracks
         for track in todays_liked:
@@ -1829,8 +3295,11 @@ def select_song_with_candidates(
         
         if liked_today_candidates:
             # Get play counts from today's listening history for weighted selection
-            log = load_daily_log(today)
-            play_counts = log.get("play_counts", {})
+            play_counts = {
+                track_id: entry["windows"]["1"]
+                for track_id, entry in play_index.items()
+                if entry["windows"].get("1")
+            }
             
             selected = select_song_from_candidates(
                 liked_today_candidates, play_counts, selection_mode=selection_mode
@@ -1846,18 +3315,18 @@ def select_song_with_candidates(
     # Only use today's listening for the candidates we report
     # (multi-day fallback is just for selection, not for email reporting)
     fallback_levels = [
-        ("today's listening", [today], True),  # True = include in listened_candidates
-        ("last 2 days", [today, today - timedelta(days=1)], False),
-        ("last 3 days", [today - timedelta(days=i) for i in range(3)], False),
-        ("last week", [today - timedelta(days=i) for i in range(7)], False),
+        ("today's listening", 1, True),  # True = include in listened_candidates
+        ("last 2 days", 2, False),
+        ("last 3 days", 3, False),
+        ("last week", 7, False),
     ]
     
-    for level_name, days, include_in_report in fallback_levels:
+    for level_name, window_days, include_in_report in fallback_levels:
         if verbose:
             print(f"\n  Trying {level_name}...")
         
-        candidates, play_counts = get_candidates_from_days(
-            days, cooldown_ids, min_duration, verbose=False
+        candidates, play_counts = get_candidates_from_index(
+            play_index, window_days, cooldown_ids, min_duration, verbose=False
         )
         
         if verbose:
@@ -1908,19 +3377,20 @@ def select_song_with_candidates(
 # Finalize (Add Song to Playlist)
 # =============================================================================
 
-def add_track_to_playlist(sp, playlist_id: str, track_id: str) -> bool:
+def add_track_to_playlist(sp, playlist_id: str, track_id: str) -> Optional[Dict[str, Any]]:
     """
     Add a track to the end of the playlist.
     
-    Returns True on success, False on failure.
+    Returns the API response (holding the playlist's new snapshot_id) on
+    success, None on failure.
     """
     try:
         track_uri = f"spotify:track:{track_id}"
-        retry_on_timeout(lambda: sp.playlist_add_items(playlist_id, [track_uri]))
-        return True
+        result = retry_on_timeout(lambda: sp.playlist_add_items(playlist_id, [track_uri]))
+        return result or {}
     except Exception as e:
         print(f"  ❌ Failed to add track: {e}", file=sys.stderr)
-        return False
+        return None
 
 
 def finalize_day(
@@ -1929,6 +3399,7 @@ def finalize_day(
     dry_run: bool = False,
     verbose: bool = True,
     print_email: bool = False,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> int:
     """
     Finalize the day: ensure playlist has correct number of songs for day of year.
@@ -1943,15 +3414,24 @@ def finalize_day(
     - Deleted songs get replaced
     - If you're behind (e.g., script didn't run), it catches up
     
+    The playlist is fetched once; songs added during the run are appended to
+    the in-memory snapshot, and later checks only compare Spotify's
+    snapshot_id (re-fetching on a mismatch), so catching up on several days
+    doesn't re-download the playlist for every song.
+    
+    The date, day number and target are resolved once (ctx, built here if not
+    given) and used by every step, so a run straddling midnight or
+    day_boundary_hour stays on one day.
+    
     Returns exit code: 0 for success, 1 for error.
     """
-    tz = pytz.timezone(config["timezone"])
-    now = datetime.now(tz)
-    today = get_today(tz)
-    effective_date = get_effective_date(config)
-    target_count = get_target_song_count(config)
-    year_start = get_year_start_date(config)
-    day_number = (effective_date - year_start).days + 1
+    ctx = ctx or get_run_context(config)
+    tz = ctx["tz"]
+    now = ctx["now"]
+    today = ctx["today"]
+    effective_date = ctx["effective_date"]
+    target_count = ctx["target_count"]
+    day_number = ctx["day_number"]
     profile_name = get_profile()
     
     if verbose:
@@ -1972,37 +3452,37 @@ def finalize_day(
         print(f"Playlist ID: {playlist_id}")
     
     # Get current playlist state
-    snapshot = take_playlist_snapshot(sp, config)
+    snapshot = take_playlist_snapshot(sp, config, ctx=ctx)
     if not snapshot:
         print(f"❌ Could not fetch playlist!", file=sys.stderr)
         return 1
     
     # Record any user-added songs (tracks added today that aren't in additions log)
-    existing_additions = load_additions_log()
     existing_today_ids = {
-        e["track_id"] for e in existing_additions 
-        if e.get("date") == effective_date.isoformat()
+        e["track_id"] for e in get_additions_for_period(effective_date, effective_date)
     }
     
+    day_start_ms, day_end_ms = day_bounds_ms(effective_date, tz)
     for track in snapshot.get("tracks", []):
-        added_at = track.get("added_at", "")
-        if added_at:
-            try:
-                added_dt = datetime.fromisoformat(added_at.replace("Z", "+00:00"))
-                added_local = added_dt.astimezone(tz)
-                if added_local.date() == effective_date and track["track_id"] not in existing_today_ids:
-                    # This track was added today but not recorded - it's a user addition
-                    record_addition(
-                        track_id=track["track_id"],
-                        track_name=track["track_name"],
-                        artist=track["artist"],
-                        source="user",
-                        date_added=effective_date,
-                    )
-                    if verbose:
-                        print(f"  📝 Recorded user addition: {track['track_name']} — {track['artist']}")
-            except (ValueError, TypeError):
-                pass
+        try:
+            added_at_ms = record_time_ms(track, "added_at")
+        except (ValueError, TypeError):
+            continue
+        if (
+            added_at_ms is not None
+            and day_start_ms <= added_at_ms < day_end_ms
+            and track["track_id"] not in existing_today_ids
+        ):
+            # This track was added today but not recorded - it's a user addition
+            record_addition(
+                track_id=track["track_id"],
+                track_name=track["track_name"],
+                artist=track["artist"],
+                source="user",
+                date_added=effective_date,
+            )
+            if verbose:
+                print(f"  📝 Recorded user addition: {track['track_name']} — {track['artist']}")
     
     playlist_count_before = snapshot["track_count"]
     songs_needed = target_count - playlist_count_before
@@ -2022,7 +3502,8 @@ def finalize_day(
         track_id = play["track_id"]
         if track_id not in seen_tracks:
             seen_tracks[track_id] = play
-    all_listened_songs = list(seen_tracks.values())
+    track_table = load_track_metadata()
+    all_listened_songs = [join_play(play, track_table) for play in seen_tracks.values()]
     
     # Track what we add and candidates considered
     songs_added: List[Dict[str, Any]] = []
@@ -2030,6 +3511,9 @@ def finalize_day(
     all_listened_candidates: List[Dict[str, Any]] = []
     extra_exclude_ids: set = set()
     
+    # Listening history for the selection cascade, loaded once for all picks
+    play_index = build_play_index(today)
+    
     if songs_needed <= 0:
         if verbose:
             if songs_needed == 0:
@@ -2043,7 +3527,9 @@ def finalize_day(
         _, liked_candidates, listened_candidates = select_song_with_candidates(
             sp, config, snapshot, 
             verbose=False, 
-            extra_exclude_ids=extra_exclude_ids
+            extra_exclude_ids=extra_exclude_ids,
+            play_index=play_index,
+            ctx=ctx,
         )
         all_liked_candidates = liked_candidates
         all_listened_candidates = listened_candidates
@@ -2056,14 +3542,17 @@ def finalize_day(
             if verbose:
                 print(f"\n--- Selecting song {i + 1} of {songs_needed} ---")
             
-            # Re-fetch snapshot if we've added songs (to update cooldown correctly)
+            # Songs we added are already in the snapshot; just make sure nothing
+            # else changed the playlist (so the cooldown stays correct)
             if songs_added and not dry_run:
-                snapshot = take_playlist_snapshot(sp, config)
+                snapshot = refresh_playlist_snapshot(sp, config, snapshot, ctx=ctx) or snapshot
             
             selected, liked_candidates, listened_candidates = select_song_with_candidates(
                 sp, config, snapshot, 
                 verbose=verbose, 
-                extra_exclude_ids=extra_exclude_ids
+                extra_exclude_ids=extra_exclude_ids,
+                play_index=play_index,
+                ctx=ctx,
             )
             
             # Collect liked candidates (avoid duplicates)
@@ -2095,9 +3584,10 @@ def finalize_day(
                 if verbose:
                     print(f"  Adding to playlist...")
                 
-                success = add_track_to_playlist(sp, playlist_id, selected["track_id"])
+                result = add_track_to_playlist(sp, playlist_id, selected["track_id"])
                 
-                if success:
+                if result is not None:
+                    append_to_snapshot(snapshot, selected, result.get("snapshot_id"), ctx)
                     if verbose:
                         print(f"  ✅ Added: {selected['track_name']} — {selected['artist']}")
                     
@@ -2118,15 +3608,18 @@ def finalize_day(
     
     # Get final snapshot (always, for email recent tracks)
     if not dry_run:
-        final_snapshot = take_playlist_snapshot(sp, config)
+        final_snapshot = refresh_playlist_snapshot(sp, config, snapshot, ctx=ctx)
         if final_snapshot:
             playlist_count_after = final_snapshot["track_count"]
             recent_tracks = final_snapshot.get("tracks", [])
+            recent_tracker = final_snapshot.get("cooldown")
         else:
             playlist_count_after = playlist_count_before + len(songs_added)
             recent_tracks = snapshot.get("tracks", [])
+            recent_tracker = snapshot.get("cooldown")
     else:
         playlist_count_after = playlist_count_before + len(songs_added)
+        recent_tracker = None
         # For dry run, simulate the added songs in the track list
         recent_tracks = list(snapshot.get("tracks", []))
         for song in songs_added:
@@ -2171,6 +3664,8 @@ def finalize_day(
         listened_candidates=all_listened_candidates,
         play_counts=play_counts,
         all_listened_songs=all_listened_songs,
+        cooldown_tracker=recent_tracker,
+        ctx=ctx,
     )
     
     # Return success if we're at or above target, or if we added all we could
@@ -2190,15 +3685,14 @@ def finalize_day(
 # Status Display
 # =============================================================================
 
-def show_status(sp, config: Dict[str, Any]) -> None:
+def show_status(sp, config: Dict[str, Any], ctx: Optional[Dict[str, Any]] = None) -> None:
     """Show current status: today's listening, playlist state, etc."""
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
-    now = datetime.now(tz)
-    effective_date = get_effective_date(config)
-    target_count = get_target_song_count(config)
-    year_start = get_year_start_date(config)
-    day_number = (effective_date - year_start).days + 1
+    ctx = ctx or get_run_context(config)
+    today = ctx["today"]
+    now = ctx["now"]
+    effective_date = ctx["effective_date"]
+    target_count = ctx["target_count"]
+    day_number = ctx["day_number"]
     
     print(f"\n{'='*60}")
     print(f"Song of the Day Status — {effective_date} (Day {day_number})")
@@ -2209,7 +3703,7 @@ def show_status(sp, config: Dict[str, Any]) -> None:
     print(f"Playlist: {config['playlist_name']}")
     if config.get("playlist_id"):
         print(f"Playlist ID: {config['playlist_id']}")
-    print(f"Year start: {year_start}")
+    print(f"Year start: {ctx['year_start']}")
     print(f"Day boundary: {config.get('day_boundary_hour', 4)}:00 (new day starts at this hour)")
     print(f"Cooldown: {config['cooldown_entries']} entries")
     print(f"Min duration: {config['min_duration_ms'] // 1000}s")
@@ -2222,7 +3716,7 @@ def show_status(sp, config: Dict[str, Any]) -> None:
         print(f"   Create the playlist in Spotify first.")
     else:
         # Get current snapshot
-        snapshot = take_playlist_snapshot(sp, config)
+        snapshot = take_playlist_snapshot(sp, config, ctx=ctx)
         
         if snapshot:
             current_count = snapshot['track_count']
@@ -2260,10 +3754,9 @@ def show_status(sp, config: Dict[str, Any]) -> None:
             key=lambda x: x[1], 
             reverse=True
         )
+        tracks = get_log_track_metadata(log)
         for tid, count in sorted_counts[:10]:
-            name = next((p["track_name"] for p in log["plays"] if p["track_id"] == tid), tid)
-            artist = next((p["artist"] for p in log["plays"] if p["track_id"] == tid), "")
-            print(f"  {count}x - {name} — {artist}")
+            print(f"  {count}x - {format_track(tracks, tid)}")
         if len(sorted_counts) > 10:
             print(f"  ... and {len(sorted_counts) - 10} more tracks")
     
@@ -2278,17 +3771,19 @@ def generate_weekly_summary(
     config: Dict[str, Any], 
     verbose: bool = True,
     profile_name: Optional[str] = None,
+    ctx: Optional[Dict[str, Any]] = None,
 ) -> Tuple[str, str]:
     """
     Generate a weekly summary of songs added.
     
     Args:
         profile_name: Profile name for display (omit from header if "default")
+        ctx: The run's context from get_run_context (built here if not given)
     
     Returns (plain_text, html) versions of the summary.
     """
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
+    ctx = ctx or get_run_context(config)
+    today = ctx["today"]
     playlist_name = config.get('playlist_name', 'Song of the Day')
     
     # Get the last 7 days (including today)
@@ -2407,21 +3902,24 @@ def generate_weekly_summary(
     return plain_text, html_text
 
 
-def send_weekly_summary(config: Dict[str, Any], verbose: bool = True) -> int:
+def send_weekly_summary(
+    config: Dict[str, Any], verbose: bool = True, ctx: Optional[Dict[str, Any]] = None
+) -> int:
     """
     Generate and send the weekly summary email.
     
     Returns exit code: 0 for success, 1 for error.
     """
-    tz = pytz.timezone(config["timezone"])
-    today = get_today(tz)
+    ctx = ctx or get_run_context(config)
     profile_name = get_profile()
     playlist_name = config.get('playlist_name', 'Song of the Day')
     
     if verbose:
         print("Generating weekly summary...")
     
-    plain_text, html_text = generate_weekly_summary(config, verbose=verbose, profile_name=profile_name)
+    plain_text, html_text = generate_weekly_summary(
+        config, verbose=verbose, profile_name=profile_name, ctx=ctx
+    )
     
     if verbose:
         print("\n" + plain_text + "\n")
@@ -2464,12 +3962,15 @@ def main() -> int:
         epilog="""
 Examples:
   %(prog)s --poll                       # Record listening history (run every minute)
+  %(prog)s --daemon                     # Poll continuously (instead of --poll cron)
+  %(prog)s --daemon --interval 30       # Poll every 30 seconds
   %(prog)s --status                     # Poll + show today's stats (always fresh)
   %(prog)s --finalize                   # Add song if none added today (run nightly)
   %(prog)s --dry-run                    # Test finalize without modifying playlist
   %(prog)s --finalize --print-email     # Print nightly report to stdout (no SMTP required)
   %(prog)s --weekly-summary             # Email summary of this week's songs
   %(prog)s --profile dave-auto --poll   # Use a different profile
+  %(prog)s --migrate-state              # Move JSON state files into state.db (SQLite)
         """,
     )
     
@@ -2479,6 +3980,12 @@ Examples:
         action="store_true",
         help="Fetch and record recent listening history",
     )
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run continuously, polling listening history every --interval seconds "
+             "(stop with SIGTERM)",
+    )
     mode.add_argument(
         "--finalize",
         action="store_true",
@@ -2505,6 +4012,12 @@ Examples:
         help="Discard the saved token and run the Spotify sign-in flow again "
              "(run locally, then copy .cache to any headless server)",
     )
+    mode.add_argument(
+        "--migrate-state",
+        action="store_true",
+        help="One-time import of the JSON state files into state.db (SQLite); "
+             "later runs read and write the database instead",
+    )
 
     parser.add_argument(
         "--profile", "-p",
@@ -2517,6 +4030,13 @@ Examples:
         action="store_true",
         help="Suppress non-essential output",
     )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="For --daemon: seconds between polls (default: poll_interval_seconds in config)",
+    )
     parser.add_argument(
         "--no-poll",
         action="store_true",
@@ -2531,11 +4051,19 @@ Examples:
     args = parser.parse_args()
     if args.print_email and not (args.finalize or args.dry_run):
         parser.error("--print-email only applies with --finalize or --dry-run")
+    if args.interval is not None and not args.daemon:
+        parser.error("--interval only applies with --daemon")
+    if args.interval is not None and args.interval <= 0:
+        parser.error("--interval must be positive")
     verbose = not args.quiet
     
     # Set profile before anything else
     set_profile(args.profile)
     
+    # Retry events are flushed under the state lock by each command; this
+    # catches any recorded outside it
+    atexit.register(flush_retry_log_at_exit)
+    
     # Initialize
     config = load_config()
     
@@ -2545,6 +4073,11 @@ Examples:
         print(f"State directory: {get_state_dir()}")
         print(f"Config: {get_config_path()}")
 
+    # Offline state migration (no Spotify access needed).
+    if args.migrate_state:
+        with state_lock(get_state_lock_path()):
+            return migrate_state_to_db(verbose=verbose)
+
     # Re-authorization entry point (run locally; opens a browser).
     if args.reauth:
         return do_reauth(config, verbose=verbose)
@@ -2564,46 +4097,67 @@ Examples:
         user = get_current_user_display(sp)
         print(f"Authenticated as: {user}\n")
     
+    # Read the clock once; every step of this run works on the same day
+    ctx = get_run_context(config)
+    
     # Execute mode
     if args.poll:
-        try:
-            poll_listening_history(sp, config, verbose=verbose)
-        except TRANSIENT_ERRORS as e:
-            if _is_transient(e):
-                # Transient error after retries exhausted — exit cleanly.
-                # Next cron invocation (in ~60s) will try again; no error email.
-                print(f"⚠ Transient error during poll, will retry next cycle: {e}",
-                      file=sys.stderr)
+        # If the previous poll is still running (e.g. in retry backoff), this
+        # tick is covered by it: skip instead of piling up behind it
+        with state_lock(get_state_lock_path(), blocking=False) as locked:
+            if not locked:
+                if verbose:
+                    print("⏭ Another run is using this profile's state; skipping this poll")
                 return 0
-            raise
-        return 0
-    
-    elif args.status:
-        # Implicitly poll first to get fresh data (unless --no-poll)
-        if not args.no_poll:
-            if verbose:
-                print("Refreshing listening data...\n")
-            poll_listening_history(sp, config, verbose=False)
-        show_status(sp, config)
+            try:
+                poll_listening_history(sp, config, verbose=verbose, ctx=ctx)
+            except TRANSIENT_ERRORS as e:
+                if _is_transient(e):
+                    # Transient error after retries exhausted — exit cleanly.
+                    # Next cron invocation (in ~60s) will try again; no error email.
+                    print(f"⚠ Transient error during poll, will retry next cycle: {e}",
+                          file=sys.stderr)
+                    return 0
+                raise
+            finally:
+                flush_retry_log()
         return 0
     
-    elif args.finalize or args.dry_run:
-        return finalize_day(
-            sp,
-            config,
-            dry_run=args.dry_run,
-            verbose=verbose,
-            print_email=args.print_email,
-        )
+    elif args.daemon:
+        interval = args.interval or config.get("poll_interval_seconds", 60)
+        return run_daemon(sp, config, interval, verbose=verbose)
     
-    elif args.weekly_summary:
-        return send_weekly_summary(config, verbose=verbose)
+    # The remaining commands wait for a poll in progress to finish
+    with state_lock(get_state_lock_path()):
+        try:
+            if args.status:
+                # Implicitly poll first to get fresh data (unless --no-poll)
+                if not args.no_poll:
+                    if verbose:
+                        print("Refreshing listening data...\n")
+                    poll_listening_history(sp, config, verbose=False, ctx=ctx)
+                show_status(sp, config, ctx=ctx)
+                return 0
+            
+            elif args.finalize or args.dry_run:
+                return finalize_day(
+                    sp,
+                    config,
+                    dry_run=args.dry_run,
+                    verbose=verbose,
+                    print_email=args.print_email,
+                    ctx=ctx,
+                )
+            
+            elif args.weekly_summary:
+                return send_weekly_summary(config, verbose=verbose, ctx=ctx)
+        finally:
+            flush_retry_log()
     
     return 0
 
 
 if __name__ == "__main__":
-    import atexit
     import gc
     
     def cleanup():
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Shared paginator for full scans of Spotify paged endpoints.
+
+Spotify's paging objects report the total item count, so after the first page
+every remaining offset is known up front. fetch_all_items fetches those pages
+with a small thread pool instead of following "next" links one at a time, and
+waits out 429 rate limiting (honoring Retry-After) before retrying a page.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from spotipy.exceptions import SpotifyException
+
+PAGE_WORKERS = 4  # concurrent page requests per scan
+RATE_LIMIT_RETRIES = 5  # attempts per page while rate limited
+RATE_LIMIT_DEFAULT_WAIT = 2.0  # seconds, if a 429 has no Retry-After header
+
+
+def _retry_after(exc: SpotifyException, attempt: int) -> float:
+    """Seconds to wait after a 429: Retry-After if present, else exponential."""
+    headers = getattr(exc, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return RATE_LIMIT_DEFAULT_WAIT * (2 ** attempt)
+
+
+def fetch_page_with_backoff(
+    fetch_page: Callable[[int, int], Dict[str, Any]], offset: int, limit: int
+) -> Dict[str, Any]:
+    """
+    Call fetch_page(offset, limit), sleeping and retrying while rate limited.
+
+    Returns the page, or raises the last SpotifyException once
+    RATE_LIMIT_RETRIES attempts have all been rejected with 429.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fetch_page(offset, limit)
+        except SpotifyException as e:
+            if e.http_status != 429 or attempt >= RATE_LIMIT_RETRIES - 1:
+                raise
+            time.sleep(_retry_after(e, attempt))
+            attempt += 1
+
+
+def fetch_all_items(
+    fetch_page: Callable[[int, int], Dict[str, Any]],
+    limit: int,
+    workers: int = PAGE_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch every item from a paged endpoint, in order.
+
+    fetch_page(offset, limit) must return a Spotify paging object with "items"
+    and "total" (when passing a fields filter, include "total"). The first page
+    is fetched on its own to learn the total; the remaining pages are fetched
+    concurrently by up to `workers` threads.
+
+    Returns the items of all pages concatenated in offset order, so an item's
+    index is its position in the collection.
+    """
+    first = fetch_page_with_backoff(fetch_page, 0, limit)
+    items = list(first.get("items") or [])
+    total = first.get("total") or 0
+
+    offsets = list(range(limit, total, limit)) if len(items) >= limit else []
+    if not offsets:
+        return items
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(offsets)))) as pool:
+        # map() yields results in submission (offset) order
+        for page in pool.map(lambda offset: fetch_page_with_backoff(fetch_page, offset, limit), offsets):
+            items.extend(page.get("items") or [])
+    return items
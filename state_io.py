@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Shared state-file helpers.
+
+Both song_of_the_day.py and liked_songs_by_country.py keep their state as JSON
+under ~/.spotify-tools/ (see spotify_auth.get_state_dir). Files that grow during
+a run (daily listening logs, the artist-country cache) are written as JSON Lines
+journals: each write appends only the new records, and readers replay the
+journal on top of the last compacted JSON file. Whole-file saves go through
+write_json_atomic, so a crash mid-write leaves the previous file intact.
+
+Runs that overlap (a per-minute --poll cron tick and a slow finalize, say)
+coordinate through state_lock, an advisory lock per profile.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, runs are not coordinated
+    fcntl = None
+
+
+def append_jsonl(path: Path, records: Iterable[Dict[str, Any]]) -> None:
+    """
+    Append records to a JSON Lines file, one compact object per line.
+
+    The data is flushed and fsynced before returning, so a crash can lose at
+    most the line being written (which read_jsonl skips).
+    """
+    lines = "".join(
+        json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        for record in records
+    )
+    if not lines:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read all records from a JSON Lines file, or [] if it doesn't exist.
+
+    Blank and unparseable lines are skipped — the latter can only be a torn
+    final line from a crash mid-append.
+    """
+    if not path.exists():
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _replace_atomic(path: Path, write: Callable[[TextIO], None]) -> None:
+    """Write a temporary file with write(f), fsync it and rename it over path."""
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable (not supported on every platform)
+    try:
+        dir_fd = os.open(str(path.parent), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def write_json_atomic(path: Path, data: Any, compact: bool = False) -> None:
+    """
+    Replace a JSON file without ever leaving it truncated.
+
+    The data is written to a temporary file in the same directory, fsynced and
+    renamed over `path`, so readers (and a crash) see either the old or the
+    new contents. compact=True drops the indentation, for machine-only files.
+    """
+    if compact:
+        _replace_atomic(path, lambda f: json.dump(data, f, separators=(",", ":")))
+    else:
+        _replace_atomic(path, lambda f: json.dump(data, f, indent=2))
+
+
+def write_jsonl_atomic(path: Path, records: Iterable[Dict[str, Any]]) -> None:
+    """
+    Replace a JSON Lines file with `records`, the way write_json_atomic does.
+
+    Used to rewrite (compact or merge into) a journal that is otherwise only
+    appended to.
+    """
+    lines = "".join(
+        json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        for record in records
+    )
+    _replace_atomic(path, lambda f: f.write(lines))
+
+
+@contextmanager
+def state_lock(path: Path, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an exclusive advisory lock on `path` (created if needed) for the
+    duration of the with block.
+
+    blocking=True waits for the lock; blocking=False gives up at once if
+    another process holds it. Yields True if the lock is held, False if it
+    was busy. The lock is released when the block exits (or the process
+    dies), so a crashed run never leaves it stuck.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(f.fileno(), flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,52 @@
+"""Tests for the daily listening log journals kept by song_of_the_day."""
+
+import os
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import song_of_the_day as sotd
+
+
+DAY = date(2026, 1, 5)
+
+
+class CompactDailyJournalsTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.TemporaryDirectory()
+        env = mock.patch.dict(os.environ, {"SPOTIFY_STATE_DIR": self.state_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.state_dir.cleanup)
+        log = sotd.load_daily_log(DAY)
+        play = {"track_id": "t1", "played_at": "2026-01-05T12:00:00.000Z"}
+        sotd.add_play(log, play)
+        sotd.append_daily_log(DAY, log, [play])
+
+    def assert_single_play(self):
+        log = sotd.load_daily_log(DAY)
+        self.assertEqual(len(log["plays"]), 1)
+        self.assertEqual(log["play_counts"], {"t1": 1})
+
+    def test_compact_twice(self):
+        sotd.compact_daily_journals(date(2026, 1, 6))
+        sotd.compact_daily_journals(date(2026, 1, 6))
+        self.assertFalse(sotd.get_daily_journal_path(DAY).exists())
+        self.assert_single_play()
+
+    def test_compact_after_crash_before_unlink(self):
+        # The day file is written but the journal is left behind
+        with mock.patch.object(Path, "unlink"):
+            sotd.compact_daily_journals(date(2026, 1, 6))
+        self.assertTrue(sotd.get_daily_journal_path(DAY).exists())
+        self.assert_single_play()
+
+        sotd.compact_daily_journals(date(2026, 1, 6))
+        self.assertFalse(sotd.get_daily_journal_path(DAY).exists())
+        self.assert_single_play()
+
+
+if __name__ == "__main__":
+    unittest.main()
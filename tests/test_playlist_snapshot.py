@@ -0,0 +1,77 @@
+"""Tests for the playlist snapshot kept by song_of_the_day."""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+import song_of_the_day as sotd
+
+
+class FakeSpotify:
+    """Just enough of spotipy.Spotify for fetch_playlist_snapshot."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def playlist(self, playlist_id, fields=None):
+        return {"snapshot_id": "v1"}
+
+    def playlist_items(self, playlist_id, additional_types=None, fields=None, limit=100, offset=0):
+        return {"items": self.items[offset:offset + limit], "total": len(self.items)}
+
+
+def playlist_item(track_id):
+    return {
+        "added_at": "2026-01-01T12:00:00Z",
+        "track": {
+            "id": track_id,
+            "name": f"Song {track_id}",
+            "artists": [{"name": "Artist"}],
+            "duration_ms": 200000,
+            "type": "track",
+        },
+    }
+
+
+class AppendToSnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.TemporaryDirectory()
+        env = mock.patch.dict(os.environ, {"SPOTIFY_STATE_DIR": self.state_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.state_dir.cleanup)
+        self.config = {"playlist_id": "p1", "playlist_name": "Songs", "timezone": "UTC"}
+        self.ctx = sotd.get_run_context(self.config, datetime(2026, 1, 2, 21, 30, tzinfo=timezone.utc))
+        # Second item is a local file / unavailable track with no id
+        self.sp = FakeSpotify([playlist_item("a"), {"added_at": None, "track": None}, playlist_item("b")])
+
+    def append_and_save(self):
+        snapshot = sotd.fetch_playlist_snapshot(self.sp, self.config, ctx=self.ctx)
+        sotd.append_to_snapshot(snapshot, {"track_id": "c", "track_name": "Song c"}, "v2", self.ctx)
+        sotd.save_playlist_snapshot(snapshot)
+        return snapshot
+
+    def test_positions_stay_unique_after_skipped_item(self):
+        snapshot = self.append_and_save()
+        positions = [t["position"] for t in snapshot["tracks"]]
+        self.assertEqual(positions, [0, 2, 3])
+        self.assertEqual(snapshot["track_count"], 3)
+        self.assertEqual(sotd.load_playlist_snapshot()["tracks"][-1]["position"], 3)
+
+    def test_timestamps_come_from_run_context(self):
+        snapshot = self.append_and_save()
+        self.assertEqual(snapshot["last_checked"], self.ctx["now"].isoformat())
+        self.assertEqual(snapshot["tracks"][-1]["added_at"], "2026-01-02T21:30:00Z")
+
+    def test_state_db_save_after_skipped_item(self):
+        sotd.open_state_db(Path(self.state_dir.name) / "state.db").close()
+        self.append_and_save()
+        positions = [t["position"] for t in sotd.load_playlist_snapshot()["tracks"]]
+        self.assertEqual(positions, [0, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()